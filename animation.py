@@ -0,0 +1,111 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""Frame budgeted playback of solver events, so big searches animate without stalling the main loop"""
+import time
+from grid_model import START, END
+
+SPEEDS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+DURATIONS = (None, 2, 5, 10, 30)  # seconds, None is speed mode
+FRAME_BUDGET = 0.010  # seconds per frame spent applying events, the rest is left for drawing
+CHUNK = 64  # events applied between two looks at the clock
+
+
+class Playback:
+    """Playback settings shared by successive animations: speed, target duration, pause and single step"""
+
+    def __init__(self, speed=16, duration=None):
+        self.speed = speed  # events per frame in speed mode
+        self.duration = duration  # target total duration in seconds, None for speed mode
+        self.paused = False
+        self.pending_steps = 0
+
+    def faster(self):
+        self.speed = SPEEDS[min(SPEEDS.index(self.speed) + 1, len(SPEEDS) - 1)]
+
+    def slower(self):
+        self.speed = SPEEDS[max(SPEEDS.index(self.speed) - 1, 0)]
+
+    def next_duration(self):
+        self.duration = DURATIONS[(DURATIONS.index(self.duration) + 1) % len(DURATIONS)]
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def step(self):
+        """Pause and apply a single event on the next frame"""
+        self.paused = True
+        self.pending_steps += 1
+
+    def __str__(self):
+        mode = f"{self.duration}s" if self.duration else f"x{self.speed}"
+        return f"{mode}{' (paused)' if self.paused else ''}"
+
+
+class Animation:
+    """
+    Applies the (state, index) events of a solvers.SearchTrace to a grid a frame at a time, start and end cells
+    are never repainted. The trace may still be recording (solvers.trace_in_background), the playback then
+    waits on the events the search hasn't made yet
+    """
+
+    def __init__(self, grid, trace, playback):
+        self.grid = grid
+        self.trace = trace
+        self.playback = playback
+        self.position = 0
+        self.elapsed = 0.0  # play time, pauses excluded
+        self.last_frame = time.perf_counter()
+        self.done = False
+
+    @property
+    def result(self):
+        """SearchResult of the search being replayed, None while it runs"""
+        return self.trace.result
+
+    def _quota(self, dt):
+        """Number of events to apply this frame"""
+        playback = self.playback
+        if playback.paused:
+            steps, playback.pending_steps = playback.pending_steps, 0
+            return steps
+        if playback.duration:  # over the events recorded so far while the search runs
+            self.elapsed += dt
+            return max(int(len(self.trace) * min(self.elapsed / playback.duration, 1)) - self.position, 1)
+        return playback.speed
+
+    def advance(self, frame_budget=FRAME_BUDGET):
+        """Apply the events of one frame, return False once every event has been applied"""
+        now = time.perf_counter()
+        dt, self.last_frame = min(now - self.last_frame, 0.1), now  # don't jump ahead after a long frame
+        if self.done:
+            return False
+        quota = self._quota(dt)
+        deadline = now + frame_budget
+        while quota > 0 and not self.done:
+            n = self._apply(min(quota, CHUNK))
+            if n == 0:  # the search is behind the playback
+                break
+            quota -= n
+            if time.perf_counter() > deadline:
+                break
+        return not self.done
+
+    def finish(self):
+        """Apply every remaining event at once, after waiting for the end of the search"""
+        self.trace.wait()
+        while not self.done:
+            self._apply(4096)
+
+    def _apply(self, n):
+        trace = self.trace
+        over = trace.result is not None or trace.error is not None  # read first, no event comes after it
+        first = self.position
+        last = min(first + n, len(trace))
+        states, set_index = self.grid.states, self.grid.set_index
+        for state, index in zip(trace.states[first:last], trace.indices[first:last]):
+            if states[index] != START and states[index] != END:
+                set_index(index, state)
+        self.position = last
+        if over and last == len(trace):
+            trace.wait()  # raises the exception of a failed search
+            self.done = True
+        return last - first
@@ -0,0 +1,67 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""
+The UI images packed in a single sprite sheet, assets/atlas.png, already at the size they are shown: startup loads
+one file and scales nothing. Rebuild it after changing an image of assets/ or a size below:
+
+    python atlas.py
+"""
+import os
+import pygame
+
+ATLAS_FILE = os.path.join("assets", "atlas.png")
+
+# name: (source image in assets/, scale it is shown at), stacked top to bottom in this order in the sheet
+SPRITES = {
+    "title": ("title.png", 0.4),
+    "open": ("open.png", 0.55),
+    "visited": ("visited.png", 0.55),
+    "path": ("path.png", 0.55),
+    "wall": ("wall.png", 0.55),
+    "start": ("start.png", 0.55),
+    "end": ("end.png", 0.55),
+    "solve": ("solve.png", 0.65),
+    "reset": ("reset.png", 0.5),
+    "reset_2": ("reset_2.png", 0.5),
+    "clean": ("clean.png", 0.5),
+    "walls": ("walls.png", 0.55),
+    "clean_walls": ("clean_walls.png", 0.55),
+    "maze": ("maze.png", 0.55),
+}
+
+# scaled size of each sprite, so that the sheet can be cut without opening the source images
+SIZES = {"title": (496, 36), "solve": (107, 42), "reset": (82, 32), "reset_2": (82, 32), "clean": (82, 32)}
+SIZES.update((name, (90, 35)) for name in SPRITES if name not in SIZES)
+
+
+def layout():
+    """name -> pygame.Rect of each sprite in the sheet"""
+    rects, y = {}, 0
+    for name in SPRITES:
+        rects[name] = pygame.Rect((0, y), SIZES[name])
+        y += SIZES[name][1]
+    return rects
+
+
+def load_atlas(path=ATLAS_FILE):
+    """name -> sprite (subsurface of the sheet), the display must be set for convert_alpha"""
+    sheet = pygame.image.load(path).convert_alpha()
+    return {name: sheet.subsurface(rect) for name, rect in layout().items()}
+
+
+def build_atlas(folder="assets", path=ATLAS_FILE):
+    """Scale the source images and write the sheet"""
+    rects = layout()
+    sheet = pygame.Surface((max(rect.right for rect in rects.values()), max(rect.bottom for rect in rects.values())),
+                           pygame.SRCALPHA)
+    for name, (file, scale) in SPRITES.items():
+        image = pygame.image.load(os.path.join(folder, file))
+        size = (int(image.get_width() * scale), int(image.get_height() * scale))
+        if size != SIZES[name]:
+            raise ValueError(f"{file} is {size[0]}x{size[1]} at scale {scale}, update SIZES[{name!r}]")
+        sheet.blit(pygame.transform.scale(image, size), rects[name])
+    pygame.image.save(sheet, path)
+
+
+if __name__ == '__main__':
+    build_atlas()
+    print(f"wrote {ATLAS_FILE}")
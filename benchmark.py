@@ -0,0 +1,157 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""
+Reproducible benchmark of the solvers and map generators, headless (no pygame needed).
+
+Every scenario is generated from a fixed seed: empty grids, random walls at several densities, recursive
+division, Kruskal and Prim mazes and weighted noise terrain, at several grid sizes. Every algorithm of
+algorithms.ALGORITHMS solves the corner to corner query of every scenario. Results are written as JSON so that
+two runs can be compared:
+
+    python benchmark.py -o before.json
+    python benchmark.py -o after.json --compare before.json
+
+--compare lists the regressions (slower than --threshold, more nodes expanded, longer paths) and exits with 1
+if there are any.
+"""
+import argparse
+import importlib
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import algorithms
+import solvers
+from grid_model import Grid, START, END
+from maze import make_maze, kruskal_maze, prim_maze, build_random_walls, build_random_terrain
+
+SIZES = ((29, 57), (101, 201), (201, 401))  # (rows, columns), odd for the maze generator
+QUICK_SIZES = ((29, 57),)
+DENSITIES = (0.15, 0.3, 0.45)
+SEED = 2022
+
+
+def scenarios(sizes, seed=SEED):
+    """Yield (name, grid, start, end, generator seconds) for every map of the corpus"""
+    for rows, columns in sizes:
+        kinds = ([("empty", None)] + [(f"walls{int(rate * 100)}", rate) for rate in DENSITIES] +
+                 [("maze", "maze"), ("kruskal", "kruskal"), ("prim", "prim"), ("terrain", "terrain")])
+        for kind, rate in kinds:
+            grid = Grid(rows, columns)
+            start, end = (1, 1), (rows - 2, columns - 2)
+            grid.set(*start, START)
+            grid.set(*end, END)
+            rng = random.Random(f"{seed}-{kind}-{rows}x{columns}")
+            began = time.perf_counter()
+            if rate == "maze":
+                random.seed(rng.random())  # make_maze draws from the random module
+                make_maze(grid, lambda: None)
+            elif rate == "kruskal":
+                kruskal_maze(grid, rng=rng.random)
+            elif rate == "prim":
+                prim_maze(grid, rng=rng.random)
+            elif rate == "terrain":
+                build_random_terrain(grid, rng=rng.random)
+            elif rate is not None:
+                build_random_walls(grid, rate, rng.random)
+            yield f"{kind}-{rows}x{columns}", grid, start, end, time.perf_counter() - began
+
+
+def measure(solver, grid, start, end, kwargs, repeat, counters=False):
+    """
+    Best wall time of repeat runs, then one more run under tracemalloc for the peak memory,
+    and one instrumented run for the search counters and phase timers if counters is set
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = solver(grid, start, end, **kwargs)
+        best = min(best, time.perf_counter() - began)
+    tracemalloc.start()
+    solver(grid, start, end, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    measures = {"seconds": best, "expanded": result.expanded, "pushed": result.pushed,
+                "peak_bytes": peak, "length": result.length, "cost": solvers.path_cost(grid, result.path)}
+    if counters:
+        measures["counters"] = solvers.instrument(solver, grid, start, end, **kwargs).as_dict()
+    return measures
+
+
+def run(sizes, repeat=3, seed=SEED, counters=False, log=print):
+    if solvers.wavefront_available():
+        importlib.import_module("numpy")  # the wavefront solver imports it on first use, not to be timed
+    results, generators = {}, {}
+    for name, grid, start, end, generated in scenarios(sizes, seed):
+        generators[name] = generated
+        for _, solver, kwargs in algorithms.ALGORITHMS:
+            key = f"{name}/{solver.__name__}"
+            results[key] = measure(solver, grid, start, end, kwargs, repeat, counters)
+            log(f"{key:45} {results[key]['seconds'] * 1000:10.2f} ms {results[key]['expanded']:10} expanded "
+                f"{results[key]['length']:6} long")
+    return {"meta": {"python": platform.python_version(), "machine": platform.machine(),
+                     "platform": platform.platform(), "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                     "repeat": repeat, "seed": seed, "sizes": [list(size) for size in sizes]},
+            "generators": generators, "results": results}
+
+
+def compare(old, new, threshold=1.10, noise=0.0005):
+    """
+    Regression messages of new against old: time ratio above threshold (differences under noise seconds are
+    ignored), more expanded nodes, other path lengths or costs
+    """
+    regressions = []
+    for key, after in new["results"].items():
+        before = old["results"].get(key)
+        if before is None:
+            continue
+        ratio = after["seconds"] / max(before["seconds"], 1e-9)
+        if ratio > threshold and after["seconds"] - before["seconds"] > noise:
+            regressions.append(f"{key}: {ratio:.2f}x slower ({before['seconds'] * 1000:.2f} -> "
+                               f"{after['seconds'] * 1000:.2f} ms)")
+        if after["expanded"] > before["expanded"]:
+            regressions.append(f"{key}: {before['expanded']} -> {after['expanded']} nodes expanded")
+        if after["length"] != before["length"]:
+            regressions.append(f"{key}: path length {before['length']} -> {after['length']}")
+        if after.get("cost", after["length"]) != before.get("cost", before["length"]):
+            regressions.append(f"{key}: path cost {before.get('cost')} -> {after.get('cost')}")
+    for name, after in new["generators"].items():
+        before = old["generators"].get(name)
+        if before is not None and after / max(before, 1e-9) > threshold and after - before > noise:
+            regressions.append(f"{name} generator: {after / before:.2f}x slower")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the path finding solvers on seeded maps")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.10, help="time ratio flagged as a regression")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measure, the best time is kept")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--quick", action="store_true", help="only the smallest grid size")
+    parser.add_argument("--counters", action="store_true", help="also record the solvers.instrument counters")
+    args = parser.parse_args()
+
+    report = run(QUICK_SIZES if args.quick else SIZES, args.repeat, args.seed, args.counters)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline["meta"].get("seed") != args.seed:
+            print(">>> baseline uses another seed, the maps are not the same")
+        regressions = compare(baseline, report, args.threshold)
+        for line in regressions:
+            print(">>> REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+        print("no regression")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 # Code by Adrien TIMBERT @ github.com/aleolux
 import pygame
-from random import random
-from color_constants import *
+from color_constants import RGB, WHITE, WHITESMOKE
+from grid_model import *
+from mapfile import load_map
+from movingai import read_map, is_movingai_map
 
 WINDOW_HEIGHT = 768
 WINDOW_WIDTH = 1024
@@ -14,184 +16,279 @@ COLOR_CLOSED = RGB(255, 120, 120)
 COLOR_WALL = RGB(120, 120, 120)
 COLOR_PATH = RGB(51, 153, 255)
 COLOR_LINES = WHITE
+COLOR_BACKGROUND = WHITESMOKE
 COLOR_END = RGB(0, 0, 153)
 COLOR_START = RGB(76, 153, 0)
+COLOR_TERRAIN_LOW = RGB(236, 226, 198)  # cost 2
+COLOR_TERRAIN_HIGH = RGB(150, 110, 70)  # cost TERRAIN_MAX and above
+TERRAIN_MAX = 9
 
-WALLS_RATE = 0.15
-
-COLUMNS = 57  # must be odd for maze generation
+COLUMNS = 57  # default grid size, must be odd for maze generation
 ROWS = 29  # must be odd for maze generation
 
 SPOT_WIDTH = 16
 SPOT_HEIGHT = 16
 
-GRID_AREA = ((GRID_OFFSET_X, GRID_OFFSET_Y), (GRID_OFFSET_X + COLUMNS * SPOT_WIDTH, GRID_OFFSET_Y + ROWS * SPOT_HEIGHT))
-
-
-class Node:
-    """Node class"""
-
-    def __init__(self, i, j):
-        self.id = "-".join([str(x) for x in [i, j]])
-        self.i = i
-        self.j = j
-        self.x = (self.j * SPOT_WIDTH) + GRID_OFFSET_X
-        self.y = (self.i * SPOT_HEIGHT) + GRID_OFFSET_Y
-        self.f_score = float("inf")
-        self.g_score = float("inf")
-        self.color = COLOR_BLANK
-        self.previous = None
-
-    def __lt__(self, other):
-        return self.f_score < other.f_score
-
-    def __gt__(self, other):
-        return self.f_score > other.f_score
-
-    def __str__(self):
-        return f"({self.i},{self.j}, f_score: {self.f_score}, g_score: {self.g_score})"
-
-    def get_pos(self):
-        return self.i, self.j
-
-    def make_blank(self):
-        self.color = COLOR_BLANK
-
-    def make_open(self):
-        self.color = COLOR_OPEN
-
-    def make_closed(self):
-        self.color = COLOR_CLOSED
-
-    def make_wall(self):
-        self.color = COLOR_WALL
-
-    def make_path(self):
-        self.color = COLOR_PATH
-
-    def make_start(self):
-        self.color = COLOR_START
-
-    def make_end(self):
-        self.color = COLOR_END
-
-    def is_open(self):
-        return self.color == COLOR_OPEN
-
-    def is_closed(self):
-        return self.color == COLOR_CLOSED
-
-    def is_wall(self):
-        return self.color == COLOR_WALL
-
-    def is_path(self):
-        return self.color == COLOR_PATH
-
-    def is_start(self):
-        return self.color == COLOR_START
-
-    def is_end(self):
-        return self.color == COLOR_END
-
-    def draw(self, screen):
-        """Draw shape for each type of node"""
-        if self.is_wall():
-            pygame.draw.rect(screen, self.color, (self.x, self.y, SPOT_WIDTH, SPOT_HEIGHT))
-        elif self.is_end():
-            pygame.draw.circle(screen, self.color, (self.x + (SPOT_WIDTH // 2), self.y + (SPOT_HEIGHT // 2)),
-                               SPOT_WIDTH // 2 - 1, 2)
-            pygame.draw.circle(screen, self.color, (self.x + (SPOT_WIDTH // 2), self.y + (SPOT_HEIGHT // 2)),
-                               SPOT_WIDTH // 2 - 5, 7)
-        elif self.is_start():
-            pygame.draw.polygon(screen, self.color,
-                                points=[(self.x, self.y),
-                                        (self.x + SPOT_WIDTH, self.y + (SPOT_HEIGHT // 2)),
-                                        (self.x, self.y + SPOT_HEIGHT)], width=0)
-        else:
-            pygame.draw.circle(screen, self.color, (self.x + (SPOT_WIDTH // 2), self.y + (SPOT_HEIGHT // 2)),
-                               SPOT_WIDTH // 2 - 2, 100)
-
-    def get_neighbours(self, grid):
-        """Get adjacent node in 4 directions: N, S, E, W"""
-        neighbours = []
-        if self.i > 0:  # South
-            neighbours.append(grid[self.i - 1][self.j])
-        if self.j > 0:  # West
-            neighbours.append(grid[self.i][self.j - 1])
-        if self.i < len(grid) - 1:  # North
-            neighbours.append(grid[self.i + 1][self.j])
-        if self.j < len(grid[self.i]) - 1:  # East
-            neighbours.append(grid[self.i][self.j + 1])
-        return neighbours
-
-
-def generate_grid():
-    """Create a ROWS*COLUMNS matrix with Nodes"""
-    grid = []
-    for i in range(ROWS):
-        grid.append([])
-        for j in range(COLUMNS):
-            grid[i].append(Node(i, j))
-    return grid
-
-
-def build_random_walls(grid):
-    """Generate randomly walls on the grid"""
-    for row in grid:
-        for node in row:
-            rand = random()
-            if rand < WALLS_RATE and not (node.is_start() or node.is_end()):
-                node.make_wall()
-    return
-
-
-def draw_grid_lines(screen):
-    """Draw grid lines on the screen"""
-    for i in range(1, ROWS):
-        pygame.draw.line(screen, COLOR_LINES,
-                         (GRID_OFFSET_X, GRID_OFFSET_Y + (i * SPOT_HEIGHT)),
-                         (GRID_OFFSET_X + COLUMNS * SPOT_WIDTH, GRID_OFFSET_Y + (i * SPOT_HEIGHT)))
-    for i in range(1, COLUMNS):
-        pygame.draw.line(screen, COLOR_LINES,
-                         (GRID_OFFSET_X + i * SPOT_WIDTH, GRID_OFFSET_Y),
-                         (GRID_OFFSET_X + i * SPOT_WIDTH, GRID_OFFSET_Y + SPOT_HEIGHT * ROWS))
-    return
-
-
-def draw(grid, screen):
-    """draw the grid on the screen"""
-    for row in grid:
-        for node in row:
-            # print(f"{node.i} {node.j} | {node.x} {node.y}")
-            node.draw(screen)
-    draw_grid_lines(screen)
-    pygame.display.update()
+GRID_RECT = pygame.Rect(GRID_OFFSET_X, GRID_OFFSET_Y, COLUMNS * SPOT_WIDTH + 1, ROWS * SPOT_HEIGHT + 1)  # view area
+
+ZOOMS = (1, 2, 4, 8, 12, 16, 24, 32)  # cell sizes of the view, in pixels
+DETAIL_ZOOM = 8  # from this size on cells get their shapes and grid lines, below they are flat colors
+
+
+STATE_COLORS = {BLANK: COLOR_BLANK, OPEN: COLOR_OPEN, CLOSED: COLOR_CLOSED, WALL: COLOR_WALL,
+                PATH: COLOR_PATH, START: COLOR_START, END: COLOR_END}
+
+
+def terrain_color(cost):
+    """Background color of a cell of that cost, plain ground (1) is the grid background"""
+    if cost <= 1:
+        return COLOR_BACKGROUND
+    t = (min(cost, TERRAIN_MAX) - 2) / (TERRAIN_MAX - 2)
+    return RGB(*(round(low + (high - low) * t) for low, high in zip(COLOR_TERRAIN_LOW, COLOR_TERRAIN_HIGH)))
+
+
+TERRAIN_COLORS = [terrain_color(cost) for cost in range(MAX_COST + 1)]
+
+# flat colors of the far zoom levels: palette image where a cell is one byte, its state or 8 + its terrain cost
+TERRAIN_INDEX = 8
+PALETTE = [STATE_COLORS.get(index, COLOR_BACKGROUND) for index in range(TERRAIN_INDEX)] + \
+          [TERRAIN_COLORS[cost] for cost in range(256 - TERRAIN_INDEX)]
+TERRAIN_INDICES = bytes(TERRAIN_INDEX + min(cost, TERRAIN_MAX) if cost > 1 else BLANK for cost in range(256))
+BLANK_MASK = bytes(0xFF if state == BLANK else 0 for state in range(256))  # translate table, 0xFF on blank cells
+
+
+class Viewport:
+    """
+    Camera over the grid: the cells are size pixels wide and the view shows the part of them that fits in rect,
+    scrolled by (x, y) pixels. Only the visible cells are drawn.
+    """
+
+    def __init__(self, grid, rect=GRID_RECT, size=None):
+        self.grid = grid
+        self.rect = rect
+        self.x = self.y = 0
+        self.size = size or self.fit_size()
+        self.changed = True  # zoomed or scrolled, the next draw redraws the whole view
+        self.sprites = {}  # (state, terrain cost, edges) -> cell pre-rendered at sprites_size, see sprite()
+        self.sprites_size = None
+
+    def fit_size(self):
+        """Largest zoom showing the whole grid, the smallest one if none does"""
+        fitting = [size for size in ZOOMS if self.grid.columns * size < self.rect.width and
+                   self.grid.rows * size < self.rect.height]
+        return fitting[-1] if fitting else ZOOMS[0]
+
+    def fit(self):
+        self.size = self.fit_size()
+        self.x = self.y = 0
+        self.changed = True
+
+    def visible(self):
+        """First row, last row + 1, first column, last column + 1 of the cells in view"""
+        size = self.size
+        return (self.y // size, min(self.grid.rows, (self.y + self.rect.height + size - 1) // size),
+                self.x // size, min(self.grid.columns, (self.x + self.rect.width + size - 1) // size))
+
+    def cell_at(self, pos):
+        """(i, j) of the cell under the screen position pos, None outside of the grid"""
+        x, y = pos
+        if not self.rect.collidepoint(x, y):
+            return None
+        i, j = (y - self.rect.top + self.y) // self.size, (x - self.rect.left + self.x) // self.size
+        return (i, j) if self.grid.in_bounds(i, j) else None
+
+    def cell_rect(self, i, j):
+        return pygame.Rect(self.rect.left + j * self.size - self.x, self.rect.top + i * self.size - self.y,
+                           self.size, self.size)
+
+    def zoom(self, steps, anchor=None):
+        """Zoom steps levels in (out if negative), the point under the screen position anchor stays in place"""
+        level = min(max(ZOOMS.index(self.size) + steps, 0), len(ZOOMS) - 1) if self.size in ZOOMS else 0
+        x, y = anchor if anchor is not None else self.rect.center
+        x, y = x - self.rect.left, y - self.rect.top
+        self.x = (self.x + x) * ZOOMS[level] // self.size - x
+        self.y = (self.y + y) * ZOOMS[level] // self.size - y
+        self.size = ZOOMS[level]
+        self._clamp()
+        self.changed = True
+
+    def pan(self, dx, dy):
+        """Drag the grid by (dx, dy) pixels"""
+        self.x -= dx
+        self.y -= dy
+        self._clamp()
+        self.changed = True
+
+    def sprite(self, state, cost, edges):
+        """Cell surface at the current zoom, rendered on first use, the cache starts over when the zoom changes"""
+        if self.sprites_size != self.size:
+            self.sprites, self.sprites_size = {}, self.size
+        key = (state, min(cost, TERRAIN_MAX), edges)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = render_cell(self.size, *key)
+        return sprite
+
+    def _clamp(self):
+        self.x = max(0, min(self.x, self.grid.columns * self.size + 1 - self.rect.width))
+        self.y = max(0, min(self.y, self.grid.rows * self.size + 1 - self.rect.height))
+
+
+def draw_node(screen, state, rect):
+    """Draw shape for each type of node"""
+    color = STATE_COLORS[state]
+    x, y, size = rect.x, rect.y, rect.width
+    if state == BLANK:  # nothing on top of the background
+        return
+    if state == WALL:
+        pygame.draw.rect(screen, color, rect)
+    elif state == END:
+        pygame.draw.circle(screen, color, rect.center, size // 2 - 1, max(1, size // 8))
+        pygame.draw.circle(screen, color, rect.center, max(1, size * 3 // 16), size)
+    elif state == START:
+        pygame.draw.polygon(screen, color,
+                            points=[(x, y),
+                                    (x + size, y + (size // 2)),
+                                    (x, y + size)], width=0)
+    else:
+        pygame.draw.circle(screen, color, rect.center, max(1, size // 2 - 2), size)
+
+
+def render_cell(size, state, cost, edges):
+    """
+    Surface of a size x size cell: terrain background, node shape and the grid lines of its top side if edges & 1
+    (not the first row) and of its left side if edges & 2 (not the first column)
+    """
+    surface = pygame.Surface((size, size))
+    rect = surface.get_rect()
+    surface.fill(TERRAIN_COLORS[cost])
+    draw_node(surface, state, rect)
+    if edges & 1:
+        pygame.draw.line(surface, COLOR_LINES, (0, 0), (size - 1, 0))
+    if edges & 2:
+        pygame.draw.line(surface, COLOR_LINES, (0, 0), (0, size - 1))
+    return surface.convert() if pygame.display.get_surface() is not None else surface
+
+
+def generate_grid(rows=ROWS, columns=COLUMNS):
+    """Create a rows*columns grid of blank cells"""
+    return Grid(rows, columns)
+
+
+def open_grid(path):
+    """
+    Grid, start and end Node of a map file (see mapfile.py) or a MovingAI .map, start and end are placed as
+    reset_start_end does if the file has none
+    """
+    if is_movingai_map(path):
+        grid, start, end = read_map(path), None, None
+    else:
+        grid, start, end = load_map(path)
+    if start is None or end is None:
+        return (grid,) + reset_start_end(grid, *(grid[i][j] for i, j in filter(None, (start, end))))
+    return grid, grid[start[0]][start[1]], grid[end[0]][end[1]]
+
+
+def cell_blits(view, indices):
+    """(sprite, screen position) of each cell, to be drawn with a single Surface.blits call"""
+    grid, size, sprite = view.grid, view.size, view.sprite
+    states, costs, columns = grid.states, grid.costs, grid.columns
+    left, top = view.rect.left - view.x, view.rect.top - view.y
+    blits = []
+    for index in indices:
+        i, j = divmod(index, columns)
+        blits.append((sprite(states[index], costs[index] if costs is not None else 1, (i > 0) | (j > 0) << 1),
+                      (left + j * size, top + i * size)))
+    return blits
+
+
+def draw_cell(view, screen, index):
+    """Fill a single cell with its flat color (far zoom levels), return its rect"""
+    grid = view.grid
+    rect = view.cell_rect(*grid.position(index))
+    state = grid.states[index]
+    if state != BLANK:
+        screen.fill(STATE_COLORS[state], rect)
+    else:
+        screen.fill(TERRAIN_COLORS[grid.costs[index] if grid.costs is not None else 1], rect)
+    return rect
+
+
+def draw_pixels(view, screen):
+    """Draw the visible cells as flat colors: one byte per cell palette image, scaled to the zoom"""
+    grid, size = view.grid, view.size
+    i0, i1, j0, j1 = view.visible()
+    columns, width, height = grid.columns, j1 - j0, i1 - i0
+    data = b"".join(grid.states[i * columns + j0:i * columns + j1] for i in range(i0, i1))
+    if grid.costs is not None:  # terrain on the blank cells, merged as big integers: state | (terrain & blank)
+        terrain = b"".join(grid.costs[i * columns + j0:i * columns + j1] for i in range(i0, i1))
+        terrain = int.from_bytes(terrain.translate(TERRAIN_INDICES), "big")
+        blank = int.from_bytes(data.translate(BLANK_MASK), "big")
+        data = (int.from_bytes(data, "big") | (terrain & blank)).to_bytes(len(data), "big")
+    image = pygame.image.fromstring(data, (width, height), "P")
+    image.set_palette(PALETTE)
+    if size > 1:
+        image = pygame.transform.scale(image, (width * size, height * size))
+    screen.blit(image, view.cell_rect(i0, j0))
+
+
+def draw_view(view, screen):
+    """Redraw every visible cell"""
+    screen.fill(COLOR_BACKGROUND, view.rect)
+    if view.size < DETAIL_ZOOM:
+        draw_pixels(view, screen)
+        return
+    i0, i1, j0, j1 = view.visible()
+    columns = view.grid.columns
+    screen.blits(cell_blits(view, (i * columns + j for i in range(i0, i1) for j in range(j0, j1))), doreturn=False)
+
+
+def draw_dirty(view, screen):
+    """Redraw the cells changed since the last call, return the list of screen rects that changed"""
+    dirty_all, dirty = view.grid.pop_dirty()
+    i0, i1, j0, j1 = view.visible()
+    clip = screen.get_clip()
+    screen.set_clip(view.rect)
+    try:
+        if dirty_all or view.changed or len(dirty) > (i1 - i0) * (j1 - j0) // 4:
+            view.changed = False
+            draw_view(view, screen)
+            return [view.rect]
+        columns = view.grid.columns
+        visible = [index for index in dirty if i0 <= index // columns < i1 and j0 <= index % columns < j1]
+        if view.size < DETAIL_ZOOM:
+            return [draw_cell(view, screen, index).clip(view.rect) for index in visible]
+        blits = cell_blits(view, visible)  # cells out of view are drawn when they are scrolled in
+        screen.blits(blits, doreturn=False)
+        return [pygame.Rect(position, (view.size, view.size)).clip(view.rect) for _, position in blits]
+    finally:
+        screen.set_clip(clip)
+
+
+def draw(view, screen):
+    """draw the changed cells of the grid and update only their rects on the display"""
+    rects = draw_dirty(view, screen)
+    if rects:
+        pygame.display.update(rects)
     return
 
 
 def reset_grid(grid):
-    """Make all Node blank"""
-    for row in grid:
-        for node in row:
-            node.make_blank()
+    """Make all Node blank, plain ground"""
+    grid.fill(BLANK)
+    grid.clear_costs()
     return
 
 
 def clean_walls(grid):
     """Make all wall Node blank"""
-    for row in grid:
-        for node in row:
-            if node.is_wall():
-                node.make_blank()
+    grid.replace((WALL,), BLANK)
     return
 
 
 def clean(grid):
     """Make all Node blank Node except walls"""
-    for row in grid:
-        for node in row:
-            if not (node.is_wall() or node.is_start() or node.is_end()):
-                node.make_blank()
+    grid.replace((OPEN, CLOSED, PATH), BLANK)
     return
 
 
@@ -201,20 +298,8 @@ def reset_start_end(grid, start=None, end=None):
         start.make_blank()
     if end is not None:
         end.make_blank()
-    default_start, default_end = (10, 10), (-10, -10)
-    start, end = grid[default_start[0]][default_start[1]], grid[default_end[0]][default_end[1]]
+    margin = min(10, (grid.rows - 1) // 2, (grid.columns - 1) // 2)  # 10 cells from the corners on big enough grids
+    start, end = grid[margin][margin], grid[grid.rows - margin][grid.columns - margin]
     start.make_start()
     end.make_end()
     return start, end
-
-
-def is_cursor_in_grid_area(pos):
-    """Return True if cursor is within grid area"""
-    x, y = pos
-    return GRID_AREA[0][0] <= x <= GRID_AREA[1][0] and GRID_AREA[0][1] <= y <= GRID_AREA[1][1]
-
-
-def spot_coordinates_from_cursor_position(pos):
-    """Return position of cursor on the grid"""
-    x, y = pos
-    return int((y - GRID_OFFSET_Y) // SPOT_HEIGHT), int((x - GRID_OFFSET_X) // SPOT_WIDTH)
@@ -0,0 +1,401 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""
+Compact grid store: one contiguous uint8 state per cell (row-major) and integer state codes.
+Nothing in here imports pygame, Node is only a thin (i, j) view over the grid used by the UI.
+"""
+
+BLANK = 0
+OPEN = 1
+CLOSED = 2
+WALL = 3
+PATH = 4
+START = 5
+END = 6
+
+STATE_NAMES = ("blank", "open", "closed", "wall", "path", "start", "end")
+
+# neighbour mask bits: bit set when the adjacent cell in that direction is on the grid and not a wall
+NORTH = 1
+WEST = 2
+SOUTH = 4
+EAST = 8
+
+PASSABLE = bytes(0 if state == WALL else 1 for state in range(256))  # translate table, 1 where not a wall
+
+MASK64 = (1 << 64) - 1
+
+MAX_COST = 255  # traversal costs are stored in one byte per cell, 1 is plain ground
+
+
+def zobrist_key(n):
+    """Pseudo random 64 bits key of an integer (splitmix64), no table to store for big grids"""
+    z = (n + 0x9E3779B97F4A7C15) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def cost_key(size, index, cost):
+    """Zobrist key of a cell cost on a grid of size cells, 0 for plain ground so a grid without costs hashes the same"""
+    return 0 if cost == 1 else zobrist_key(size + ((index << 8) | cost))
+
+
+class Grid:
+    """
+    ROWS*COLUMNS grid of cell states stored in a single bytearray.
+    An optional cost layer, one byte per cell, holds the cost of stepping onto each cell (None: every step costs 1).
+    states, masks and costs can be given as existing buffers of rows * columns bytes (shared memory, mmap...),
+    they are used as they are, not copied. content_hash, if known (map files store it), saves hashing them.
+    """
+
+    def __init__(self, rows, columns, states=None, masks=None, costs=None, content_hash=None):
+        self.rows = rows
+        self.columns = columns
+        self.states = bytearray(rows * columns) if states is None else states
+        self.costs = costs
+        for name, layer in (("states", self.states), ("costs", costs)):
+            if layer is not None and len(layer) != rows * columns:
+                raise ValueError(f"{name} holds {len(layer)} cells, a {rows}x{columns} grid needs {rows * columns}")
+        self.dirty = set()  # flat indices of the cells changed since the last redraw, none kept while dirty_all
+        self.dirty_all = True  # the whole grid needs a redraw
+        self._masks = masks  # neighbour masks, built on first use then kept up to date by set_index
+        self._content_hash = content_hash  # same, for the zobrist hash of the walls
+        self.watchers = []  # watcher(index, passable) called when a cell becomes or stops being a wall
+        self.cost_watchers = []  # watcher(index, old cost, new cost) called when the cost of a cell changes
+        # flat index offsets of the passable neighbours for each of the 16 masks, in N, W, S, E order
+        self.neighbour_offsets = tuple(
+            tuple(offset for bit, offset in ((NORTH, -columns), (WEST, -1), (SOUTH, columns), (EAST, 1)) if mask & bit)
+            for mask in range(16))
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError("grid row index out of range")
+        return GridRow(self, i)
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield GridRow(self, i)
+
+    @property
+    def size(self):
+        return self.rows * self.columns
+
+    def index(self, i, j):
+        """Flat index of cell (i, j)"""
+        return i * self.columns + j
+
+    def position(self, index):
+        """(i, j) position of a flat index"""
+        return divmod(index, self.columns)
+
+    def in_bounds(self, i, j):
+        return 0 <= i < self.rows and 0 <= j < self.columns
+
+    def get(self, i, j):
+        return self.states[i * self.columns + j]
+
+    def set(self, i, j, state):
+        self.set_index(i * self.columns + j, state)
+
+    def set_index(self, index, state):
+        """Change the state of a cell and remember it for the next redraw"""
+        old = self.states[index]
+        if old != state:
+            self.states[index] = state
+            if not self.dirty_all:  # already a full redraw, nothing to track (headless, until pop_dirty)
+                self.dirty.add(index)
+                if len(self.dirty) > self.size >> 2:  # a full redraw costs no more, and the set stops growing
+                    self.mark_all_dirty()
+            if (old == WALL) != (state == WALL):
+                if self._masks is not None:
+                    self._update_masks(index, state != WALL)
+                if self._content_hash is not None:
+                    self._content_hash ^= zobrist_key(index)
+                for watcher in self.watchers:
+                    watcher(index, state != WALL)
+
+    def get_cost(self, i, j):
+        return 1 if self.costs is None else self.costs[i * self.columns + j]
+
+    def set_cost(self, i, j, cost):
+        self.set_cost_index(i * self.columns + j, cost)
+
+    def set_cost_index(self, index, cost):
+        """Change the cost of stepping onto a cell (1 to MAX_COST), the cost layer is created on first use"""
+        if not 1 <= cost <= MAX_COST:
+            raise ValueError(f"cost {cost} is not between 1 and {MAX_COST}")
+        if self.costs is None:
+            if cost == 1:
+                return
+            self.costs = bytearray(b"\x01") * self.size
+        old = self.costs[index]
+        if old != cost:
+            self.costs[index] = cost
+            if not self.dirty_all:
+                self.dirty.add(index)
+                if len(self.dirty) > self.size >> 2:
+                    self.mark_all_dirty()
+            if self._content_hash is not None:
+                self._content_hash ^= self._cost_key(index, old) ^ self._cost_key(index, cost)
+            for watcher in self.cost_watchers:
+                watcher(index, old, cost)
+
+    def costs_changed(self):
+        """To call after writing or replacing grid.costs directly, cost watchers get watcher(-1, None, None)"""
+        self._content_hash = None
+        for watcher in self.cost_watchers:
+            watcher(-1, None, None)
+        self.mark_all_dirty()
+
+    def clear_costs(self):
+        """Back to plain ground everywhere"""
+        if self.costs is not None:
+            self.costs = None
+            self.costs_changed()
+
+    def _cost_key(self, index, cost):
+        return cost_key(self.size, index, cost)
+
+    def states_changed(self, walls=True):
+        """
+        To call after writing grid.states directly, everything is redrawn. If walls may have changed
+        the neighbour masks and the content hash are rebuilt and watchers get watcher(-1, None)
+        """
+        if walls:
+            self._masks = None
+            self._content_hash = None
+            for watcher in self.watchers:
+                watcher(-1, None)
+        self.mark_all_dirty()
+
+    @property
+    def content_hash(self):
+        """Zobrist hash of the dimensions, walls and costs, updated cell by cell as walls and costs are edited"""
+        if self._content_hash is None:
+            content_hash = zobrist_key(-1 - ((self.rows << 32) | self.columns))
+            states = bytes(self.states)
+            index = states.find(WALL)
+            while index >= 0:
+                content_hash ^= zobrist_key(index)
+                index = states.find(WALL, index + 1)
+            if self.costs is not None:
+                for index, cost in enumerate(self.costs):
+                    if cost != 1:
+                        content_hash ^= self._cost_key(index, cost)
+            self._content_hash = content_hash
+        return self._content_hash
+
+    @property
+    def masks(self):
+        """
+        Per cell 4 bits neighbour masks (NORTH | WEST | SOUTH | EAST), grid.neighbour_offsets[mask] lists the
+        index offsets of the passable neighbours so solvers need neither bounds nor wall checks
+        """
+        if self._masks is None:
+            self._masks = self._build_masks()
+        return self._masks
+
+    def _build_masks(self):
+        """
+        Build every mask at once: each byte of a big int is one cell, so shifting the int by 8 bits moves the
+        passable flags one cell along the row, by 8 * columns one row up or down
+        """
+        size, columns = self.size, self.columns
+        keep = (1 << (8 * size)) - 1
+        passable = int.from_bytes(bytes(self.states).translate(PASSABLE), "little")
+        not_first = int.from_bytes((b"\x00" + b"\x01" * (columns - 1)) * self.rows, "little")  # no west at j == 0
+        not_last = int.from_bytes((b"\x01" * (columns - 1) + b"\x00") * self.rows, "little")  # no east at j == columns - 1
+        north = (passable << (8 * columns)) & keep
+        west = (passable << 8) & not_first
+        south = passable >> (8 * columns)
+        east = (passable >> 8) & not_last
+        masks = north | (west << 1) | (south << 2) | (east << 3)
+        return bytearray(masks.to_bytes(size, "little"))
+
+    def _update_masks(self, index, passable):
+        """A cell became a wall or stopped being one: flip the bit pointing at it in each neighbour"""
+        masks, columns = self._masks, self.columns
+        j = index % columns
+        for neighbour, bit, in_bounds in ((index - columns, SOUTH, index >= columns),
+                                          (index - 1, EAST, j > 0),
+                                          (index + columns, NORTH, index + columns < self.size),
+                                          (index + 1, WEST, j < columns - 1)):
+            if in_bounds:
+                if passable:
+                    masks[neighbour] |= bit
+                else:
+                    masks[neighbour] &= ~bit
+
+    def mark_all_dirty(self):
+        """Ask for a redraw of the whole grid, used after bulk changes of the states"""
+        self.dirty_all = True
+        self.dirty.clear()
+
+    def pop_dirty(self):
+        """Return (dirty_all, dirty indices) and start tracking changes again"""
+        dirty_all, dirty = self.dirty_all, self.dirty
+        self.dirty_all, self.dirty = False, set()
+        return dirty_all, dirty
+
+    def node(self, i, j):
+        """Node view of cell (i, j)"""
+        return Node(self, i, j)
+
+    def nodes(self):
+        """Iterate over all cells as Node views, row by row"""
+        for i in range(self.rows):
+            for j in range(self.columns):
+                yield Node(self, i, j)
+
+    def fill(self, state):
+        """Set every cell to state"""
+        self.states[:] = bytes((state,)) * len(self.states)
+        self.states_changed()
+
+    def replace(self, old_states, new_state):
+        """Set every cell whose state is in old_states to new_state"""
+        table = bytearray(range(256))
+        for state in old_states:
+            table[state] = new_state
+        self.states[:] = bytes(self.states).translate(table)
+        self.states_changed(walls=WALL in old_states or new_state == WALL)
+
+    def find(self, state):
+        """Flat index of the first cell with state, -1 if there is none"""
+        return self.states.find(state)
+
+    def count(self, state):
+        return self.states.count(state)
+
+
+class GridRow:
+    """Row view so that grid[i][j] keeps working"""
+
+    __slots__ = ("grid", "i")
+
+    def __init__(self, grid, i):
+        self.grid = grid
+        self.i = i
+
+    def __len__(self):
+        return self.grid.columns
+
+    def __getitem__(self, j):
+        columns = self.grid.columns
+        if j < 0:
+            j += columns
+        if not 0 <= j < columns:
+            raise IndexError("grid column index out of range")
+        return Node(self.grid, self.i, j)
+
+    def __iter__(self):
+        grid, i = self.grid, self.i
+        for j in range(grid.columns):
+            yield Node(grid, i, j)
+
+
+class Node:
+    """Thin view over one cell of a Grid, holds no state of its own"""
+
+    __slots__ = ("grid", "i", "j")
+
+    def __init__(self, grid, i, j):
+        self.grid = grid
+        self.i = i
+        self.j = j
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.i == other.i and self.j == other.j and self.grid is other.grid
+
+    def __hash__(self):
+        return hash((self.i, self.j))
+
+    def __str__(self):
+        return f"({self.i},{self.j}, {STATE_NAMES[self.state]})"
+
+    __repr__ = __str__
+
+    @property
+    def index(self):
+        return self.i * self.grid.columns + self.j
+
+    @property
+    def state(self):
+        return self.grid.states[self.i * self.grid.columns + self.j]
+
+    @state.setter
+    def state(self, value):
+        self.grid.set_index(self.i * self.grid.columns + self.j, value)
+
+    @property
+    def cost(self):
+        return self.grid.get_cost(self.i, self.j)
+
+    @cost.setter
+    def cost(self, value):
+        self.grid.set_cost(self.i, self.j, value)
+
+    def get_pos(self):
+        return self.i, self.j
+
+    def make_blank(self):
+        self.state = BLANK
+
+    def make_open(self):
+        self.state = OPEN
+
+    def make_closed(self):
+        self.state = CLOSED
+
+    def make_wall(self):
+        self.state = WALL
+
+    def make_path(self):
+        self.state = PATH
+
+    def make_start(self):
+        self.state = START
+
+    def make_end(self):
+        self.state = END
+
+    def is_blank(self):
+        return self.state == BLANK
+
+    def is_open(self):
+        return self.state == OPEN
+
+    def is_closed(self):
+        return self.state == CLOSED
+
+    def is_wall(self):
+        return self.state == WALL
+
+    def is_path(self):
+        return self.state == PATH
+
+    def is_start(self):
+        return self.state == START
+
+    def is_end(self):
+        return self.state == END
+
+    def get_neighbours(self, grid=None):
+        """Get adjacent node in 4 directions: N, S, E, W"""
+        grid = self.grid
+        i, j = self.i, self.j
+        neighbours = []
+        if i > 0:  # South
+            neighbours.append(Node(grid, i - 1, j))
+        if j > 0:  # West
+            neighbours.append(Node(grid, i, j - 1))
+        if i < grid.rows - 1:  # North
+            neighbours.append(Node(grid, i + 1, j))
+        if j < grid.columns - 1:  # East
+            neighbours.append(Node(grid, i, j + 1))
+        return neighbours
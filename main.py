@@ -1,10 +1,17 @@
 # Code by Adrien TIMBERT @ github.com/aleolux
+import argparse
 import os
 import sys
+import time
 import algorithms
 from grid import *
 from ui import *
-from maze import make_maze
+from maze import make_maze, kruskal_maze, prim_maze, build_random_walls, build_random_terrain
+from animation import Playback
+from atlas import ATLAS_FILE, load_atlas
+from solvers import PathCache, SearchStats, d_star_lite
+from mapfile import save_map
+from movingai import is_movingai_map
 
 
 def resource_path(relative_path):
@@ -21,102 +28,194 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Python Path Finder Visualizer")
+    parser.add_argument("--rows", type=int, default=ROWS, help=f"grid height in cells (default {ROWS}, odd for mazes)")
+    parser.add_argument("--columns", type=int, default=COLUMNS,
+                        help=f"grid width in cells (default {COLUMNS}, odd for mazes)")
+    parser.add_argument("--cell", type=int, choices=ZOOMS, help="cell size in pixels (default: fit the grid)")
+    parser.add_argument("--map", help="map file (see mapfile.py) loaded at launch if it exists instead of a "
+                                      "--rows x --columns grid, the S key saves the grid to it (default grid.map)")
+    args = parser.parse_args()
+    if args.rows < 3 or args.columns < 3:
+        parser.error("the grid needs at least 3 rows and 3 columns")
+    return args
+
+
 def main():
     """Main program"""
-    pygame.init()
+    args = parse_args()
+    pygame.display.init()  # only the modules used, pygame.init() would also open the audio and joystick devices
+    pygame.font.init()
     pygame.display.set_caption("Python Path Finder Visualizer")
     clock = pygame.time.Clock()
 
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))  # load screen
 
-    # load images
-    title = Image(GRID_OFFSET_X, 15, pygame.image.load(resource_path("assets/title.png")).convert_alpha(), 0.4)  # load title
-    x_start, y_start, scale, space = GRID_OFFSET_X + 50, WINDOW_HEIGHT - 100, 0.55, 150  # load legend images
-    legend_open = Image(x_start, y_start, pygame.image.load(resource_path("assets/open.png")).convert_alpha(), 0.55)
-    legend_close = Image(x_start + space, y_start, pygame.image.load(resource_path("assets/visited.png")).convert_alpha(), scale)
-    legend_path = Image(x_start + space * 2, y_start, pygame.image.load(resource_path("assets/path.png")).convert_alpha(), scale)
-    legend_wall = Image(x_start + space * 3, y_start, pygame.image.load(resource_path("assets/wall.png")).convert_alpha(), scale)
-    legend_start = Image(x_start + space * 4, y_start, pygame.image.load(resource_path("assets/start.png")).convert_alpha(), scale)
-    legend_end = Image(x_start + space * 5, y_start, pygame.image.load(resource_path("assets/end.png")).convert_alpha(), scale)
+    # load images, already scaled in the sprite sheet (see atlas.py)
+    sprites = load_atlas(resource_path(ATLAS_FILE))
+    title = Image(GRID_OFFSET_X, 15, sprites["title"])  # load title
+    x_start, y_start, space = GRID_OFFSET_X + 50, WINDOW_HEIGHT - 100, 150  # load legend images
+    legend_open = Image(x_start, y_start, sprites["open"])
+    legend_close = Image(x_start + space, y_start, sprites["visited"])
+    legend_path = Image(x_start + space * 2, y_start, sprites["path"])
+    legend_wall = Image(x_start + space * 3, y_start, sprites["wall"])
+    legend_start = Image(x_start + space * 4, y_start, sprites["start"])
+    legend_end = Image(x_start + space * 5, y_start, sprites["end"])
     images = [title, legend_open, legend_close, legend_wall, legend_path, legend_start, legend_end]
 
     # load button images
-    start_button = Button(GRID_OFFSET_X + 550, 95, pygame.image.load(resource_path("assets/solve.png")).convert_alpha(), 0.65)
-    reset_button = Button(GRID_OFFSET_X + 750, 100, pygame.image.load(resource_path("assets/reset.png")).convert_alpha(), 0.5)
-    reset_2_button = Button(GRID_OFFSET_X + 750, 60, pygame.image.load(resource_path("assets/reset_2.png")).convert_alpha(), 0.5)
-    clean_button = Button(GRID_OFFSET_X + 750, 140, pygame.image.load(resource_path("assets/clean.png")).convert_alpha(), 0.5)
-    walls_button = Button(GRID_OFFSET_X + 200, 100, pygame.image.load(resource_path("assets/walls.png")).convert_alpha(), 0.55)
-    clean_walls_button = Button(GRID_OFFSET_X + 400, 100, pygame.image.load(resource_path("assets/clean_walls.png")).convert_alpha(),
-                                0.55)
-    maze_button = Button(GRID_OFFSET_X + 300, 100, pygame.image.load(resource_path("assets/maze.png")).convert_alpha(), 0.55)
+    start_button = Button(GRID_OFFSET_X + 550, 95, sprites["solve"])
+    reset_button = Button(GRID_OFFSET_X + 750, 100, sprites["reset"])
+    reset_2_button = Button(GRID_OFFSET_X + 750, 60, sprites["reset_2"])
+    clean_button = Button(GRID_OFFSET_X + 750, 140, sprites["clean"])
+    walls_button = Button(GRID_OFFSET_X + 200, 100, sprites["walls"])
+    clean_walls_button = Button(GRID_OFFSET_X + 400, 100, sprites["clean_walls"])
+    maze_button = Button(GRID_OFFSET_X + 300, 100, sprites["maze"])
     buttons = [start_button, reset_button, reset_2_button, clean_button, walls_button, clean_walls_button, maze_button]
 
     # load checkboxes
-    boxes = [Checkbox(screen, GRID_OFFSET_X, 80, 0, caption="A* algorithm"),
-             Checkbox(screen, GRID_OFFSET_X, 100, 1, caption="Breadth-first search"),
-             Checkbox(screen, GRID_OFFSET_X, 120, 2, caption="Depth-first search")]
+    spacing = min(17, (GRID_OFFSET_Y - 80) // (len(algorithms.ALGORITHMS) - 1))  # all above the grid
+    boxes = [Checkbox(screen, GRID_OFFSET_X, 64 + spacing * idx, idx, caption=caption)
+             for idx, (caption, _, _) in enumerate(algorithms.ALGORITHMS)]
     boxes[0].checked = True
 
     # grid generation
-    grid = generate_grid()
-    start, end = reset_start_end(grid)
+    save_path = args.map or "grid.map"
+    if args.map is not None and os.path.exists(args.map):  # only when asked, a saved grid.map never hides --rows
+        grid, start, end = open_grid(args.map)
+        print(f">>> loaded {args.map}: {grid.rows}x{grid.columns}")
+        if is_movingai_map(args.map):  # the benchmark map is never overwritten, S saves next to it
+            save_path = os.path.splitext(args.map)[0] + ".grid.map"
+    else:
+        grid = generate_grid(args.rows, args.columns)
+        start, end = reset_start_end(grid)
+    view = Viewport(grid, GRID_RECT, args.cell)  # mouse wheel or +/- zoom, right drag pans, HOME fits the grid
     set_start, set_end = False, False
 
+    # solver animation: SPACE pause, RIGHT single step, UP/DOWN speed, D target duration, ENTER finish
+    playback = Playback()
+    animation = None
+    brush = None  # terrain cost painted by clicks: 1-9 keys pick a cost, 0 back to walls (None), T random terrain
+    instrumented = False  # I key: print the counters and timers of each search once its animation is over
+    stats = None
+    cache = PathCache(grid)  # SOLVE again with the same walls replays the recorded search
+    live = None  # D* Lite plan repaired after each wall drawn, see algorithms.LivePlan
+
+    # static layer: title, legend, buttons and captions are composited once, then only the checkboxes that
+    # changed and the dirty cells of the grid are redrawn
+    background = pygame.Surface(screen.get_size()).convert()
+    background.fill(WHITESMOKE)
+    for img in images:
+        img.draw(background)
+    for button in buttons:
+        button.render(background)
+    for box in boxes:
+        box.render_caption(background)
+    screen.blit(background, (0, 0))
+    pygame.display.update()
+
     run = True
     while run:  # main loop
         clock.tick(40)
         event_list = pygame.event.get()
 
-        screen.fill(WHITESMOKE)
-
-        for img in images:
-            img.draw(screen)
+        changed = list(filter(None, [box.render_checkbox() for box in boxes]))
 
-        for box in boxes:
-            box.render_checkbox()
+        clicked = [button for button in buttons if button.update()]  # buttons pressed this frame
+        if clicked:
+            animation = None
+            stats = None
+            if live is not None:
+                live.close()
+                live = None
+        walls_drawn = False
 
-        for button in buttons:
-            button.draw(screen)
-
-        if start_button.clicked and not (set_start or set_end):  # on start button click
+        if start_button in clicked and not (set_start or set_end):  # on start button click
             clean(grid)
-            path = []
-            if boxes[0].checked:
-                path = algorithms.a_star(start, end, grid, False, lambda: draw(grid, screen))
-            elif boxes[1].checked:
-                path = algorithms.bfs(start, end, grid, lambda: draw(grid, screen))
-            elif boxes[2].checked:
-                path = algorithms.dfs_iterative(start, end, grid, lambda: draw(grid, screen))
-            if path is None or len(path) <= 0:
-                print(">>> NO SOLUTION!")
-
-        if reset_button.clicked:  # on reset button click
+            for box, (_, solver, kwargs) in zip(boxes, algorithms.ALGORITHMS):
+                if box.checked and solver is d_star_lite:
+                    live = algorithms.LivePlan(grid, start, end, playback)
+                    animation = live.animation
+                elif box.checked:
+                    stats = SearchStats(grid) if instrumented else None
+                    animation = algorithms.animate(solver, start, end, grid, playback, cache, stats, **kwargs)
+
+        if reset_button in clicked:  # on reset button click
             reset_grid(grid)
             start, end = reset_start_end(grid, start, end)
 
-        if clean_button.clicked:  # on clean button click
+        if clean_button in clicked:  # on clean button click
             clean(grid)
 
-        if reset_2_button.clicked:  # on clean start end button click
+        if reset_2_button in clicked:  # on clean start end button click
             start, end = reset_start_end(grid, start, end)
 
-        if clean_walls_button.clicked:  # on clean walls button click
+        if clean_walls_button in clicked:  # on clean walls button click
             clean_walls(grid)
 
-        if walls_button.clicked:  # on random walls button click
+        if walls_button in clicked:  # on random walls button click
             clean(grid)
             clean_walls(grid)
             build_random_walls(grid)
 
-        if maze_button.clicked:  # on build maze button click
+        if maze_button in clicked:  # on build maze button click
             clean(grid)
             clean_walls(grid)
-            make_maze(grid, lambda: draw(grid, screen))
+            make_maze(grid, lambda: draw(view, screen))
 
         for event in event_list:  # event handler
             if event.type == pygame.QUIT:  # on quit
                 run = False
 
+            if event.type == pygame.KEYDOWN:  # on animation control key
+                if event.key == pygame.K_SPACE:
+                    playback.toggle_pause()
+                elif event.key == pygame.K_RIGHT:
+                    playback.step()
+                elif event.key == pygame.K_UP:
+                    playback.faster()
+                elif event.key == pygame.K_DOWN:
+                    playback.slower()
+                elif event.key == pygame.K_d:
+                    playback.next_duration()
+                elif event.key == pygame.K_RETURN and animation is not None:
+                    animation.finish()
+                elif pygame.K_1 <= event.key <= pygame.K_9:
+                    brush = event.key - pygame.K_0
+                    print(f">>> brush: terrain of cost {brush}")
+                elif event.key == pygame.K_0:
+                    brush = None
+                    print(">>> brush: walls")
+                elif event.key == pygame.K_t:
+                    animation = None
+                    clean(grid)
+                    build_random_terrain(grid)
+                elif event.key in (pygame.K_k, pygame.K_p):  # Kruskal or Prim maze
+                    animation = None
+                    clean(grid)
+                    (kruskal_maze if event.key == pygame.K_k else prim_maze)(grid, lambda: draw(view, screen))
+                elif event.key == pygame.K_s:  # walls, costs, start and end, a start or end being moved is left out
+                    save_map(save_path, grid, None if set_start else start.get_pos(),
+                             None if set_end else end.get_pos())
+                    print(f">>> saved {save_path}")
+                elif event.key == pygame.K_i:
+                    instrumented = not instrumented
+                    print(f">>> instrumentation {'on' if instrumented else 'off'}")
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    view.zoom(1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    view.zoom(-1)
+                elif event.key == pygame.K_HOME:
+                    view.fit()
+                pygame.display.set_caption(f"Python Path Finder Visualizer - {playback}")
+
+            if event.type == pygame.MOUSEWHEEL and view.rect.collidepoint(pygame.mouse.get_pos()):  # zoom
+                view.zoom(event.y, pygame.mouse.get_pos())
+
+            if event.type == pygame.MOUSEMOTION and event.buttons[2]:  # right drag: pan
+                view.pan(*event.rel)
+
             if pygame.mouse.get_pressed()[0]:  # on left click
                 pos = pygame.mouse.get_pos()
 
@@ -127,8 +226,10 @@ def main():
                             if b != box:
                                 b.checked = False
 
-                if is_cursor_in_grid_area(pos):  # on spot click
-                    x, y = spot_coordinates_from_cursor_position(pos)
+                cell = view.cell_at(pos)
+                if cell is not None:  # on spot click
+                    x, y = cell
+                    animation = None
 
                     if set_start and (x, y) != end.get_pos():  # set start
                         start = grid[x][y]
@@ -141,6 +242,10 @@ def main():
                         set_end = False
 
                     else:
+                        if (x, y) in (start.get_pos(), end.get_pos()) and live is not None:
+                            live.close()
+                            live = None
+
                         if (x, y) == start.get_pos():  # del start
                             start.make_blank()
                             set_start = True
@@ -149,10 +254,32 @@ def main():
                             end.make_blank()
                             set_end = True
 
+                        elif brush is not None:  # paint terrain
+                            grid[x][y].cost = brush
+
                         else:  # build walls
                             grid[x][y].make_wall()
+                            walls_drawn = True
+
+        if walls_drawn and live is not None:  # the live plan follows the new walls
+            if not live.replan().found:
+                print(">>> NO SOLUTION!")
+
+        began = time.perf_counter()
+        if animation is not None and not animation.advance():
+            if not animation.result.found:  # known once the background search is over
+                print(">>> NO SOLUTION!")
+            animation = None
+        replayed = time.perf_counter()
+
+        pygame.display.update(changed + draw_dirty(view, screen))
 
-        draw(grid, screen)
+        if stats is not None:  # instrumented search: replay and draw time until its animation is over
+            stats.add_time("replay", replayed - began)
+            stats.add_time("draw", time.perf_counter() - replayed)
+            if animation is None:
+                print(f">>> {stats}")
+                stats = None
 
     pygame.quit()
     sys.exit()
@@ -0,0 +1,193 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""
+Binary map files: walls, optional costs and start/end of a grid, no pygame needed.
+
+Layout, little endian:
+- header, HEADER_SIZE bytes: magic b"PFMP", version (u16), flags (u16), rows and columns (u32), start i, j and
+  end i, j (u32, NONE when missing), content hash (u64, Grid.content_hash of the walls and costs), zero padding
+- walls: one bit per cell, 1 for a wall, most significant bit first, every row padded to a whole byte
+- costs, if flags has COSTS: one byte per cell, row-major, the Grid.costs layer as it is
+
+The file is opened with mmap: the header is read at once and the layers are paged in when used. The cost layer
+becomes the grid's cost layer without a copy (copy on write, edits never go back to the file).
+"""
+import contextlib
+import mmap
+import os
+import struct
+from grid_model import Grid, WALL, BLANK, START, END, zobrist_key, cost_key
+
+MAGIC = b"PFMP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIIIQ")
+HEADER_SIZE = 64
+NONE = 0xFFFFFFFF  # missing start or end coordinate
+
+# flags
+COSTS = 1
+HASHED = 2  # content hash known, a streamed map may skip it
+
+UNPACK_BYTES = 1 << 16  # packed bytes decoded at once by unpack_rows, bounds its temporaries
+
+WALL_BITS = bytes(ord("1") if state == WALL else ord("0") for state in range(256))  # translate table, states to bits
+BIT_STATES = bytes(WALL if byte == ord("1") else BLANK for byte in range(256))  # and back
+
+
+def pack_row(states, columns):
+    """Walls of a row of cell states as bits, padded to a whole byte"""
+    row_bytes = (columns + 7) // 8
+    return (int(bytes(states).translate(WALL_BITS), 2) << (row_bytes * 8 - columns)).to_bytes(row_bytes, "big")
+
+
+def unpack_rows(data, rows, columns, offset=0):
+    """
+    Cell states (WALL or BLANK) of rows packed rows starting at offset in data (bytes or a mmap), decoded
+    a few rows at a time: only the states are the size of the grid
+    """
+    row_bytes = (columns + 7) // 8
+    states = bytearray(rows * columns)
+    step = max(UNPACK_BYTES // max(row_bytes, 1), 1)  # rows per chunk
+    for first in range(0, rows, step):
+        count = min(step, rows - first)
+        chunk = data[offset + first * row_bytes:offset + (first + count) * row_bytes]
+        bits = format(int.from_bytes(chunk, "big"), f"0{len(chunk) * 8}b").encode().translate(BIT_STATES)
+        if columns != row_bytes * 8:
+            bits = b"".join(bits[i * row_bytes * 8:i * row_bytes * 8 + columns] for i in range(count))
+        states[first * columns:(first + count) * columns] = bits
+    return states
+
+
+def _walls_hash(states, offset):
+    """Zobrist keys of the walls of states, a row starting at flat index offset"""
+    content_hash = 0
+    index = states.find(WALL)
+    while index >= 0:
+        content_hash ^= zobrist_key(offset + index)
+        index = states.find(WALL, index + 1)
+    return content_hash
+
+
+def write_map(path, rows, columns, states_rows, start=None, end=None, costs=None, content_hash=None, hashed=True):
+    """
+    Write a map file from an iterable of rows of cell states (bytes of columns states each), written as they
+    come so it can be a generator such as maze.eller_maze. costs, if given, is the whole cost layer.
+    The content hash is computed along unless given, hashed=False skips it: a Python loop over the walls.
+    The file is written next to path then moved over it: path is never left half written, and a grid can be
+    saved over the map file its cost layer is mapped from
+    """
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            _write_layers(file, rows, columns, states_rows, start, end, costs, content_hash, hashed)
+        os.replace(temporary, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):  # open() itself failed
+            os.remove(temporary)
+        raise
+
+
+def _write_layers(file, rows, columns, states_rows, start, end, costs, content_hash, hashed):
+    flags = (COSTS if costs is not None else 0) | (HASHED if hashed else 0)
+    computed = hashed and content_hash is None
+    if computed:
+        content_hash = zobrist_key(-1 - ((rows << 32) | columns))
+    file.write(bytes(HEADER_SIZE))  # the header goes last, once the hash is known
+    count = 0
+    for states in states_rows:
+        states = bytes(states)
+        if computed:
+            content_hash ^= _walls_hash(states, count * columns)
+        file.write(pack_row(states, columns))
+        count += 1
+    if count != rows:
+        raise ValueError(f"got {count} rows, expected {rows}")
+    if costs is not None:
+        if computed:
+            size = rows * columns
+            for index, cost in enumerate(costs):
+                if cost != 1:
+                    content_hash ^= cost_key(size, index, cost)
+        file.write(costs)
+    start_i, start_j = start if start is not None else (NONE, NONE)
+    end_i, end_j = end if end is not None else (NONE, NONE)
+    file.seek(0)
+    file.write(HEADER.pack(MAGIC, VERSION, flags, rows, columns, start_i, start_j, end_i, end_j,
+                           content_hash if hashed else 0))
+
+
+def save_map(path, grid, start=None, end=None):
+    """Write grid, start and end (i, j) to a map file, only walls count: open, closed and path cells are saved blank"""
+    if isinstance(grid.costs, memoryview):  # mapped from a map file, maybe this one: Windows can't replace it mapped
+        grid.costs = bytearray(grid.costs)
+    columns = grid.columns
+    rows = (grid.states[i * columns:(i + 1) * columns] for i in range(grid.rows))
+    write_map(path, grid.rows, columns, rows, start, end, grid.costs, grid.content_hash)
+
+
+class MapFile:
+    """
+    Open map file: the header fields are read at once, the layers are only read through the mmap when a row or
+    the whole grid is asked for
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        if len(self.data) < HEADER_SIZE:
+            raise ValueError(f"{path} is not a map file")
+        magic, version, flags, rows, columns, start_i, start_j, end_i, end_j, content_hash = \
+            HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a map file")
+        if version > VERSION:
+            raise ValueError(f"{path} is a version {version} map file, this version reads up to {VERSION}")
+        self.rows, self.columns, self.flags = rows, columns, flags
+        self.start = (start_i, start_j) if start_i != NONE else None
+        self.end = (end_i, end_j) if end_i != NONE else None
+        self.content_hash = content_hash if flags & HASHED else None
+        self.row_bytes = (columns + 7) // 8
+        self.costs_offset = HEADER_SIZE + rows * self.row_bytes
+        expected = self.costs_offset + (rows * columns if flags & COSTS else 0)
+        if len(self.data) < expected:
+            raise ValueError(f"{path} is truncated: {len(self.data)} bytes, a {rows}x{columns} map needs {expected}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmap the file, once the grids built from it are gone (their cost layer is the mapping)"""
+        self.data.close()
+
+    def read_rows(self, first, last):
+        """Cell states of rows first to last - 1, walls and blanks only"""
+        return unpack_rows(self.data, last - first, self.columns, HEADER_SIZE + first * self.row_bytes)
+
+    def grid(self, verify=False):
+        """
+        Grid of the map with its start and end cells. The cost layer is a view of the mapping, paged in as
+        it is read. verify recomputes the content hash and raises ValueError if the file doesn't match it
+        """
+        rows, columns = self.rows, self.columns
+        costs = None
+        if self.flags & COSTS:
+            costs = memoryview(self.data)[self.costs_offset:self.costs_offset + rows * columns]
+        grid = Grid(rows, columns, self.read_rows(0, rows), costs=costs,
+                    content_hash=None if verify else self.content_hash)
+        if verify and self.content_hash is not None and grid.content_hash != self.content_hash:
+            raise ValueError("the map content doesn't match the hash of its header")
+        for position, state in ((self.start, START), (self.end, END)):
+            if position is not None:
+                grid.set(*position, state)
+        return grid
+
+
+def load_map(path, verify=False):
+    """Grid, start and end (i, j or None) of a map file"""
+    map_file = MapFile(path)
+    grid = map_file.grid(verify)
+    if grid.costs is None:
+        map_file.close()  # nothing refers to the mapping, the cost layer keeps it open otherwise
+    return grid, map_file.start, map_file.end
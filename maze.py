@@ -4,22 +4,65 @@
 # https://stackoverflow.com/questions/23530756/maze-recursive-division-algorithm-design
 import random
 import math
+from grid_model import BLANK, START, END, WALL
+from mapfile import pack_row, write_map
 
+WALLS_RATE = 0.15
+IN_MAZE, IN_FRONTIER = 1, 2  # room status of prim_maze
 
-def create_outside_walls(grid: list):
+
+def build_random_walls(grid, rate=WALLS_RATE, rng=random.random):
+    """Generate randomly walls on the grid, rng() gives floats in [0, 1)"""
+    states = grid.states
+    for idx in range(len(states)):
+        if rng() < rate and states[idx] not in (START, END):
+            states[idx] = WALL
+    grid.states_changed()
+    return
+
+
+def build_random_terrain(grid, max_cost=9, scale=8, rng=random.random):
+    """
+    Value noise terrain: random heights on a lattice every scale cells, interpolated in between and turned
+    into costs from 1 to max_cost. scale=1 gives every cell its own random cost
+    """
+    rows, columns = grid.rows, grid.columns
+    heights = [[rng() for _ in range(columns // scale + 2)] for _ in range(rows // scale + 2)]
+    costs = bytearray(rows * columns)
+    for i in range(rows):
+        y, dy = divmod(i, scale)
+        ty = dy / scale
+        top, bottom = heights[y], heights[y + 1]
+        row = i * columns
+        for j in range(columns):
+            x, dx = divmod(j, scale)
+            tx = dx / scale
+            height = ((top[x] * (1 - tx) + top[x + 1] * tx) * (1 - ty) +
+                      (bottom[x] * (1 - tx) + bottom[x + 1] * tx) * ty)
+            costs[row + j] = 1 + int(height * max_cost)
+    grid.costs = costs
+    grid.costs_changed()
+    return
+
+
+# translate table turning every cell into a wall except the start and end cells
+WALL_OVER = bytes(state if state in (START, END) else WALL for state in range(256))
+
+
+def _build_wall(grid, start, stop, step=1):
+    """Turn the cells start:stop:step of grid.states into walls with a single slice write, marked for redraw"""
+    states = grid.states
+    states[start:stop:step] = states[start:stop:step].translate(WALL_OVER)
+    grid.dirty.update(range(start, stop, step))
+
+
+def create_outside_walls(grid):
     """Create border walls"""
-    for idx, row in enumerate(grid):  # for each row
-        if idx == 0 or idx == len(grid) - 1:  # fill the first and the last row
-            for node in row:
-                if not (node.is_start() or node.is_end()):
-                    node.make_wall()
-        else:  # fill the first and the last columns
-            node = row[0]
-            if not (node.is_start() or node.is_end()):
-                node.make_wall()
-            node = row[-1]
-            if not (node.is_start() or node.is_end()):
-                node.make_wall()
+    rows, columns = grid.rows, grid.columns
+    _build_wall(grid, 0, columns)  # first and last rows
+    _build_wall(grid, (rows - 1) * columns, rows * columns)
+    _build_wall(grid, columns, (rows - 1) * columns, columns)  # first and last columns
+    _build_wall(grid, 2 * columns - 1, (rows - 1) * columns, columns)
     return
 
 
@@ -27,60 +70,272 @@ def make_maze(grid, draw):
     """
     Starting point of the maze generator: uses recursive division
     - walls on even cells, doors in odd cells: require odd grid dimensions!
+    The chambers left to divide are kept on a stack, not the call stack, so any grid size works. Each wall is
+    written as slices of grid.states and draw() is called once per wall, not once per cell.
     """
+    columns = grid.columns
     create_outside_walls(grid)
-    add_inner_walls(random.choice([True, False]), 1, len(grid[0]) - 2, 1, len(grid) - 2, grid, draw)
+    stack = [(random.choice([True, False]), 1, columns - 2, 1, grid.rows - 2)]
+    while stack:
+        is_horizontal, min_x, max_x, min_y, max_y = stack.pop()
+        if is_horizontal:
+            if max_x - min_x < 2:
+                continue
+            first = min_y + (min_y & 1)  # random even row, what random.choice of the even rows would draw
+            if first > max_y:  # a single row, only the first chamber of a grid 3 cells high
+                continue
+            y = first + 2 * random.randrange((max_y - first) // 2 + 1)
+            hole = math.floor(random_number(min_x, max_x) / 2) * 2 + 1
+            _build_wall(grid, y * columns + min_x, y * columns + hole)
+            _build_wall(grid, y * columns + hole + 1, y * columns + max_x + 1)
+            # first chamber on top of the stack: divided first, like the recursive version
+            stack.append((False, min_x, max_x, y + 1, max_y))
+            stack.append((False, min_x, max_x, min_y, y - 1))
+        else:
+            if max_y - min_y < 2:
+                continue
+            first = min_x + (min_x & 1)
+            if first > max_x:
+                continue
+            x = first + 2 * random.randrange((max_x - first) // 2 + 1)
+            hole = math.floor(random_number(min_y, max_y) / 2) * 2 + 1
+            _build_wall(grid, min_y * columns + x, hole * columns + x, columns)
+            _build_wall(grid, (hole + 1) * columns + x, (max_y + 1) * columns + x, columns)
+            stack.append((True, x + 1, max_x, min_y, max_y))
+            stack.append((True, min_x, x - 1, min_y, max_y))
+        draw()
+    grid.states_changed()
     return
 
 
-def add_inner_walls(is_horizontal, min_x, max_x, min_y, max_y, grid, draw):
-    """Inner walls generation"""
-    if is_horizontal:
-        if max_x - min_x < 2:
-            return
+class DisjointSet:
+    """Union-find over 0..size-1: path halving in find, union by rank"""
 
-        y = random.choice([_ for _ in range(min_y, max_y + 1) if _ % 2 == 0])
-        add_horizontal_wall(min_x, max_x, y, grid, draw)
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.rank = bytearray(size)
 
-        add_inner_walls(not is_horizontal, min_x, max_x, min_y, y - 1, grid, draw)
-        add_inner_walls(not is_horizontal, min_x, max_x, y + 1, max_y, grid, draw)
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
 
-    else:
-        if max_y - min_y < 2:
-            return
+    def union(self, a, b):
+        """Merge the sets of a and b, return False if they already were the same set"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.rank[a] < self.rank[b]:
+            a, b = b, a
+        self.parent[b] = a
+        if self.rank[a] == self.rank[b]:
+            self.rank[a] += 1
+        return True
 
-        x = random.choice([_ for _ in range(min_x, max_x + 1) if _ % 2 == 0])
-        add_vertical_wall(min_y, max_y, x, grid, draw)
 
-        add_inner_walls(not is_horizontal, min_x, x - 1, min_y, max_y, grid, draw)
-        add_inner_walls(not is_horizontal, x + 1, max_x, min_y, max_y, grid, draw)
-    return
+# translate table making every cell blank except the start and end cells
+BLANK_OVER = bytes(state if state in (START, END) else BLANK for state in range(256))
 
 
-def add_horizontal_wall(min_x, max_x, y, grid, draw):
-    """Draw am horizontal wall"""
-    hole = math.floor(random_number(min_x, max_x) / 2) * 2 + 1
+def _build_rooms(grid):
+    """Walls everywhere but on the odd (row, column) cells, the rooms the spanning tree generators connect"""
+    rows, columns = grid.rows, grid.columns
+    _build_wall(grid, 0, rows * columns)
+    states = grid.states
+    for i in range(1, rows - 1, 2):
+        start, stop = i * columns + 1, (i + 1) * columns - 1
+        states[start:stop:2] = states[start:stop:2].translate(BLANK_OVER)
 
-    for i in range(min_x, max_x + 1):
-        if i != hole:
-            if not (grid[y][i].is_start() or grid[y][i].is_end()):
-                grid[y][i].make_wall()
-        draw()
-    return
 
+def _knock_down(grid, wall):
+    if grid.states[wall] == WALL:
+        grid.states[wall] = BLANK
+        grid.dirty.add(wall)
 
-def add_vertical_wall(min_y, max_y, x, grid, draw):
-    """Draw a vertical wall"""
-    hole = math.floor(random_number(min_y, max_y) / 2) * 2 + 1
 
-    for i in range(min_y, max_y + 1):
-        if i != hole:
-            if not (grid[i][x].is_start() or grid[i][x].is_end()):
-                grid[i][x].make_wall()
-        draw()
+def _room_neighbours(grid, room):
+    """Rooms two cells away from room, with the wall between them: [(room, wall), ...]"""
+    rows, columns = grid.rows, grid.columns
+    i, j = divmod(room, columns)
+    neighbours = []
+    if i >= 3:
+        neighbours.append((room - 2 * columns, room - columns))
+    if j >= 3:
+        neighbours.append((room - 2, room - 1))
+    if i + 2 <= rows - 2:
+        neighbours.append((room + 2 * columns, room + columns))
+    if j + 2 <= columns - 2:
+        neighbours.append((room + 2, room + 1))
+    return neighbours
+
+
+def kruskal_maze(grid, draw=None, rng=random.random):
+    """
+    Randomized Kruskal maze: the walls between rooms are visited in random order and knocked down when they
+    join two rooms not connected yet, a DisjointSet tells. Short winding corridors, about 30% of the rooms are
+    dead ends (17% with recursive division).
+    Same odd dimensions convention as make_maze. draw(), if given, is called every row worth of walls knocked down.
+    rng() gives floats in [0, 1)
+    """
+    rows, columns = grid.rows, grid.columns
+    _build_rooms(grid)
+    walls = [i * columns + j for i in range(1, rows - 1) for j in range(1 + i % 2, columns - 1, 2)
+             if (j + 1 < columns - 1 if i % 2 else i + 1 < rows - 1)]
+    for k in range(len(walls) - 1, 0, -1):  # Fisher-Yates shuffle driven by rng
+        m = int(rng() * (k + 1))
+        walls[k], walls[m] = walls[m], walls[k]
+    rooms = DisjointSet(rows * columns)
+    batch = max(1, columns // 2)
+    knocked = 0
+    for wall in walls:
+        a, b = (wall - 1, wall + 1) if (wall // columns) % 2 else (wall - columns, wall + columns)
+        if rooms.union(a, b):
+            _knock_down(grid, wall)
+            knocked += 1
+            if draw is not None and knocked % batch == 0:
+                draw()
+    grid.states_changed()
+    return
+
+
+def prim_maze(grid, draw=None, rng=random.random):
+    """
+    Randomized Prim maze: the maze grows from a random room, each step adds a random room of the frontier (rooms
+    next to the maze) through a random wall. The frontier is a plain list, a random pick is swapped with the
+    last item and popped in O(1). Even shorter branches than Kruskal, about 36% of the rooms are dead ends.
+    Same odd dimensions convention as make_maze. draw(), if given, is called every row worth of rooms added.
+    rng() gives floats in [0, 1)
+    """
+    rows, columns = grid.rows, grid.columns
+    _build_rooms(grid)
+    if rows < 3 or columns < 3:
+        grid.states_changed()
+        return
+    status = bytearray(rows * columns)  # IN_MAZE, IN_FRONTIER or 0
+    first = (1 + 2 * int(rng() * ((rows - 1) // 2))) * columns + 1 + 2 * int(rng() * ((columns - 1) // 2))
+    status[first] = IN_MAZE
+    frontier = []
+    for room, _ in _room_neighbours(grid, first):
+        status[room] = IN_FRONTIER
+        frontier.append(room)
+    batch = max(1, columns // 2)
+    added = 0
+    while frontier:
+        k = int(rng() * len(frontier))
+        frontier[k], frontier[-1] = frontier[-1], frontier[k]
+        room = frontier.pop()
+        status[room] = IN_MAZE
+        links = []
+        for neighbour, wall in _room_neighbours(grid, room):
+            if status[neighbour] == IN_MAZE:
+                links.append(wall)
+            elif not status[neighbour]:
+                status[neighbour] = IN_FRONTIER
+                frontier.append(neighbour)
+        _knock_down(grid, links[int(rng() * len(links))])
+        added += 1
+        if draw is not None and added % batch == 0:
+            draw()
+    grid.states_changed()
     return
 
 
+def eller_maze(rows, columns, rng=random.random):
+    """
+    Eller's algorithm: yield the cell states of a rows x columns maze (odd dimensions, same rooms and walls
+    convention as make_maze) one row at a time as bytes, keeping only O(columns) state, so the maze can be
+    streamed to a file whatever its height. Each row of rooms joins random neighbours of different sets and
+    sends at least one room of each set down, the last row joins everything left apart.
+    rng() gives floats in [0, 1)
+    """
+    if rows < 3 or columns < 3 or not rows % 2 or not columns % 2:
+        raise ValueError(f"eller_maze needs odd dimensions of at least 3, not {rows}x{columns}")
+    width, height = columns // 2, rows // 2  # rooms
+    wall_row = bytes((WALL,)) * columns
+    yield wall_row
+    labels = list(range(width))  # set of each room of the row, as the column of a room of that set
+    parent = labels
+
+    def find(c):
+        while parent[c] != c:
+            parent[c] = parent[parent[c]]
+            c = parent[c]
+        return c
+
+    for r in range(height):
+        last = r == height - 1
+        parent = labels  # union-find over the columns of this row, the set columns are their own label
+        row = bytearray(wall_row)
+        row[1::2] = bytes((BLANK,)) * width
+        for c in range(width - 1):  # join neighbours of different sets, all of them on the last row
+            a, b = find(c), find(c + 1)
+            if a != b and (last or rng() < 0.5):
+                parent[b] = a
+                row[2 * c + 2] = BLANK
+        yield bytes(row)
+        if last:
+            break
+
+        roots = [find(c) for c in range(width)]
+        members = {}
+        for c, root in enumerate(roots):
+            members.setdefault(root, []).append(c)
+        down = bytearray(width)
+        for root, cells in members.items():  # each set goes down at least once
+            for c in cells:
+                if rng() < 0.5:
+                    down[c] = 1
+            if not any(down[c] for c in cells):
+                down[cells[int(rng() * len(cells))]] = 1
+        below = bytearray(wall_row)
+        representative = {}
+        labels = []
+        for c in range(width):
+            if down[c]:
+                below[2 * c + 1] = BLANK
+                labels.append(representative.setdefault(roots[c], c))
+            else:
+                labels.append(c)  # a new set of its own
+        yield bytes(below)
+    yield wall_row
+
+
+def write_pbm(path, rows, columns, states_rows):
+    """
+    Write rows of cell states (bytes of columns states each) as a binary PBM image, walls black: one bit per
+    cell, row by row, viewable in any image viewer. Rows are written as they come, so states_rows can be a
+    generator such as eller_maze
+    """
+    with open(path, "wb") as file:
+        file.write(f"P4\n{columns} {rows}\n".encode())
+        count = 0
+        for states in states_rows:
+            file.write(pack_row(states, columns))
+            count += 1
+    if count != rows:
+        raise ValueError(f"got {count} rows, expected {rows}")
+
+
 def random_number(min_num, max_num):
     """Random number drawer"""
     return math.floor(random.random() * (max_num - min_num + 1) + min_num)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Stream an Eller's algorithm maze to a PBM image or a map file, "
+                                                 "any size")
+    parser.add_argument("rows", type=int, help="odd")
+    parser.add_argument("columns", type=int, help="odd")
+    parser.add_argument("output", help="PBM image (.pbm) or map file (see mapfile.py) to write")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--no-hash", action="store_true", help="map file without content hash, faster to write")
+    args = parser.parse_args()
+    maze_rows = eller_maze(args.rows, args.columns, random.Random(args.seed).random)
+    if args.output.lower().endswith(".pbm"):
+        write_pbm(args.output, args.rows, args.columns, maze_rows)
+    else:  # start and end in the corners, as the benchmark puts them
+        write_map(args.output, args.rows, args.columns, maze_rows, (1, 1), (args.rows - 2, args.columns - 2),
+                  hashed=not args.no_hash)
@@ -0,0 +1,209 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""
+MovingAI grid benchmarks (https://movingai.com/benchmarks/grids.html) from local files, headless (no pygame needed).
+
+A .map file becomes a grid_model.Grid of any size, odd or not. A .scen file lists queries grouped in buckets
+of similar optimal length, the runner solves every query and reports per bucket the throughput, the nodes
+expanded and the path lengths against the optimal ones:
+
+    python movingai.py arena.map.scen --maps maps/ --algorithm a_star bfs
+
+The optimal lengths of the .scen files are octile: 8 moves, diagonals cost sqrt(2) and can't cut a corner.
+The grid is 4-connected, so its shortest paths are between 1 and sqrt(2) times the octile length (a diagonal
+is two orthogonal steps through free cells), the runner checks that bound for the shortest path solvers and
+counts the queries out of it or unsolved as mismatches: the scenario doesn't belong to the map.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import algorithms
+from grid_model import Grid, BLANK, WALL
+
+PASSABLE = b".GS"  # ground, ground, swamp
+BLOCKED = b"@OTW"  # out of bounds, out of bounds, trees, water (only reachable from water, kept out)
+TERRAIN = bytes(BLANK if byte in PASSABLE else WALL for byte in range(256))  # translate table, map characters
+SHORTEST = ("a_star", "dijkstra", "jump_point_search", "bidirectional_a_star", "bfs", "bidirectional_bfs",
+            "d_star_lite", "wavefront")  # solvers returning shortest 4-connected paths
+DEFAULT_ALGORITHMS = ("a_star", "bfs", "dfs_iterative")
+
+
+class Scenario:
+    """A query of a .scen file: start and end as (i, j) positions, optimal octile length"""
+
+    __slots__ = ("bucket", "map_name", "rows", "columns", "start", "end", "optimal")
+
+    def __init__(self, bucket, map_name, rows, columns, start, end, optimal):
+        self.bucket = bucket
+        self.map_name = map_name
+        self.rows = rows
+        self.columns = columns
+        self.start = start
+        self.end = end
+        self.optimal = optimal
+
+
+def read_map(path):
+    """Grid of a MovingAI .map file, raise ValueError on a malformed file or an unknown terrain character"""
+    with open(path, "rb") as file:
+        header = {}
+        for line in file:
+            words = line.split()
+            if words == [b"map"]:
+                break
+            if len(words) == 2:
+                header[words[0].decode()] = words[1].decode()
+        else:
+            raise ValueError(f"{path}: no map line, not a MovingAI map")
+        try:
+            rows, columns = int(header["height"]), int(header["width"])
+        except (KeyError, ValueError):
+            raise ValueError(f"{path}: height and width missing from the header") from None
+        lines = [line.rstrip(b"\r\n") for line in file]
+    while lines and not lines[-1]:
+        lines.pop()
+    if len(lines) != rows or any(len(line) != columns for line in lines):
+        raise ValueError(f"{path}: the map is not the {rows}x{columns} of its header")
+    terrain = b"".join(lines)
+    unknown = terrain.translate(None, PASSABLE + BLOCKED)
+    if unknown:
+        raise ValueError(f"{path}: unknown terrain {chr(unknown[0])!r}")
+    return Grid(rows, columns, bytearray(terrain.translate(TERRAIN)))
+
+
+def is_movingai_map(path):
+    """True if the file starts as a MovingAI map does, their extension is the same as map files (see mapfile.py)"""
+    with open(path, "rb") as file:
+        return file.read(5) == b"type "
+
+
+def read_scenarios(path):
+    """Scenarios of a MovingAI .scen file, x and y of the file are the column and the row"""
+    scenarios = []
+    with open(path) as file:
+        if not file.readline().startswith("version"):
+            raise ValueError(f"{path}: no version line, not a MovingAI scenario file")
+        for number, line in enumerate(file, 2):
+            if not line.strip():
+                continue
+            fields = line.rstrip("\r\n").split("\t")
+            if len(fields) != 9:
+                fields = line.split()  # some files are space separated, their map names have no spaces
+            try:
+                bucket, columns, rows, start_x, start_y, end_x, end_y = map(int, fields[:1] + fields[2:8])
+                optimal = float(fields[8])
+            except (IndexError, ValueError):
+                raise ValueError(f"{path}:{number}: malformed scenario {line.strip()!r}") from None
+            scenarios.append(Scenario(bucket, fields[1], rows, columns, (start_y, start_x), (end_y, end_x), optimal))
+    return scenarios
+
+
+def find_map(map_name, folders):
+    """Path of the map of a scenario, looked for as written then by its file name in folders"""
+    for folder in folders:
+        for candidate in (os.path.join(folder, map_name), os.path.join(folder, os.path.basename(map_name))):
+            if os.path.isfile(candidate):
+                return candidate
+    raise FileNotFoundError(f"map {map_name} not found in {', '.join(folders)}")
+
+
+def run_scenarios(scenarios, grids, solver, kwargs=None, log=None):
+    """
+    Solve every scenario, grids is map name -> Grid. Return bucket -> measures: queries, solved, seconds,
+    expanded, pushed, sums of the optimal and found lengths of the solved ones, worst length / optimal ratio,
+    mismatches (unsolved, or out of the length bounds)
+    """
+    kwargs = kwargs or {}
+    shortest = solver.__name__ in SHORTEST
+    warmed = set()
+    buckets = {}
+    for scenario in scenarios:
+        grid = grids[scenario.map_name]
+        if scenario.map_name not in warmed:
+            # one untimed run, the grid neighbour masks and the numpy import of wavefront come with the first use
+            solver(grid, scenario.start, scenario.end, **kwargs)
+            warmed.add(scenario.map_name)
+        began = time.perf_counter()
+        result = solver(grid, scenario.start, scenario.end, **kwargs)
+        seconds = time.perf_counter() - began
+        bucket = buckets.setdefault(scenario.bucket, {"queries": 0, "solved": 0, "seconds": 0.0, "expanded": 0,
+                                                      "pushed": 0, "optimal": 0.0, "length": 0, "worst_ratio": 1.0,
+                                                      "mismatches": 0})
+        bucket["queries"] += 1
+        bucket["seconds"] += seconds
+        bucket["expanded"] += result.expanded
+        bucket["pushed"] += result.pushed
+        if not result.found:
+            bucket["mismatches"] += 1
+            if log is not None:
+                log(f"{scenario.start} -> {scenario.end}: no path, optimal {scenario.optimal}")
+            continue
+        bucket["solved"] += 1
+        bucket["optimal"] += scenario.optimal
+        bucket["length"] += result.length
+        if scenario.optimal > 0:
+            bucket["worst_ratio"] = max(bucket["worst_ratio"], result.length / scenario.optimal)
+        low, high = scenario.optimal - 1e-3, scenario.optimal * math.sqrt(2) + 1e-3
+        if result.length < low or (shortest and result.length > high):
+            bucket["mismatches"] += 1
+            if log is not None:
+                log(f"{scenario.start} -> {scenario.end}: length {result.length}, optimal {scenario.optimal}")
+    return dict(sorted(buckets.items()))
+
+
+def main():
+    by_name = {solver.__name__: (solver, kwargs) for _, solver, kwargs in algorithms.ALGORITHMS}
+    parser = argparse.ArgumentParser(description="Run MovingAI benchmark scenarios on local map files")
+    parser.add_argument("scenarios", nargs="+", help=".scen files")
+    parser.add_argument("--maps", action="append", default=[],
+                        help="folder of the .map files, can be repeated (default: next to the .scen file)")
+    parser.add_argument("--algorithm", nargs="+", choices=sorted(by_name), default=DEFAULT_ALGORITHMS)
+    parser.add_argument("--bucket", type=int, nargs="+", help="only these buckets")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every mismatch")
+    args = parser.parse_args()
+
+    report = {}
+    mismatches = 0
+    for path in args.scenarios:
+        scenarios = [scenario for scenario in read_scenarios(path)
+                     if args.bucket is None or scenario.bucket in args.bucket]
+        grids = {}
+        for scenario in scenarios:
+            if scenario.map_name not in grids:
+                grid = grids[scenario.map_name] = read_map(
+                    find_map(scenario.map_name, args.maps + [os.path.dirname(path) or "."]))
+                if (grid.rows, grid.columns) != (scenario.rows, scenario.columns):
+                    parser.error(f"{path}: {scenario.map_name} is {grid.rows}x{grid.columns}, the scenarios "
+                                 f"expect {scenario.rows}x{scenario.columns}")
+            if not (grids[scenario.map_name].in_bounds(*scenario.start) and
+                    grids[scenario.map_name].in_bounds(*scenario.end)):
+                parser.error(f"{path}: {scenario.start} -> {scenario.end} is off {scenario.map_name}")
+        print(f"{path}: {len(scenarios)} queries on {', '.join(grids)}")
+        print(f"{'algorithm':20} {'bucket':>6} {'queries':>7} {'queries/s':>10} {'expanded':>10} "
+              f"{'optimal':>9} {'length':>9} {'worst':>6} {'mismatches':>10}")
+        for name in args.algorithm:
+            solver, kwargs = by_name[name]
+            log = print if args.verbose else None
+            buckets = run_scenarios(scenarios, grids, solver, kwargs, log)
+            report.setdefault(path, {})[name] = buckets
+            for number, bucket in buckets.items():
+                solved = max(bucket["solved"], 1)
+                mismatches += bucket["mismatches"]
+                print(f"{name:20} {number:6} {bucket['queries']:7} "
+                      f"{bucket['queries'] / max(bucket['seconds'], 1e-9):10.1f} "
+                      f"{bucket['expanded'] / bucket['queries']:10.1f} {bucket['optimal'] / solved:9.2f} "
+                      f"{bucket['length'] / solved:9.2f} {bucket['worst_ratio']:6.3f} {bucket['mismatches']:10}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1, sort_keys=True)
+    if mismatches:
+        print(f">>> {mismatches} queries unsolved or out of the length bounds, check that the maps are the right ones")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""
+Headless path finding solvers: pure python, no pygame import.
+
+Every solver takes a grid_model.Grid and start/end (i, j) positions and returns a SearchResult.
+Walls are the only cell state a solver reads, the grid is never modified. a_star and dijkstra also read the
+optional cost layer (grid.costs, cost of stepping onto each cell), the other solvers count steps.
+An optional observer(state, index) is called with OPEN/CLOSED/PATH and the flat index of the cell
+each time the search opens, expands or walks back through a cell, visualization attaches there.
+solvers.steps(solver, grid, start, end) yields those events one by one once the search is over,
+solvers.trace_in_background(solver, grid, start, end) records them from a thread while the search runs.
+solvers.instrument(solver, grid, start, end) is the opt-in version with counters and phase timers (SearchStats).
+solvers.wavefront and solvers.distance_field need numpy, everything else is standard library only.
+"""
+from solvers.common import SearchResult, path_cost
+from solvers.openlist import HeapQueue, BucketQueue
+from solvers.astar import a_star, dijkstra
+from solvers.bfs import bfs
+from solvers.dfs import dfs_iterative
+from solvers.trace import SearchTrace, trace, trace_in_background, steps
+from solvers.instrument import SearchStats, instrument
+from solvers.jps import jump_point_search
+from solvers.bidirectional import bidirectional_bfs, bidirectional_a_star
+from solvers.wavefront import wavefront, distance_field, wavefront_available
+from solvers.batch import solve_many
+from solvers.cache import PathCache
+from solvers.dstar_lite import DStarLite, d_star_lite
+from solvers.hpa import HierarchicalMap, hpa_star
@@ -0,0 +1,73 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from grid_model import OPEN, CLOSED
+from solvers.common import SearchResult, build_path, check_endpoints
+from solvers.openlist import BucketQueue
+
+
+def a_star(grid, start, end, is_dijkstra=False, observer=None, open_list=BucketQueue):
+    """
+    A* algorithm, Manhattan distance heuristic (0 for Dijkstra)
+    https://en.wikipedia.org/wiki/A*_search_algorithm
+    https://en.wikipedia.org/wiki/Dijkstra%27s_algorithm
+
+    Stepping onto a cell costs grid.costs[cell], 1 if the grid has no costs. Costs are at least 1 so the
+    Manhattan distance stays admissible and consistent.
+    open_list is the open list class (solvers.openlist), the f scores are small integers so the default
+    bucket queue pushes and pops in O(1)
+    """
+    start, end = check_endpoints(grid, start, end)
+    masks, neighbour_offsets, columns, costs = grid.masks, grid.neighbour_offsets, grid.columns, grid.costs
+    end_i, end_j = divmod(end, columns)
+
+    def heuristic(index):
+        if is_dijkstra:
+            return 0
+        i, j = divmod(index, columns)
+        return abs(i - end_i) + abs(j - end_j)
+
+    g_scores = {start: 0}
+    came_from = {}
+    closed = set()
+    expanded, pushed = 0, 1
+
+    open_set = open_list()
+    push, pop = open_set.push, open_set.pop
+    push(start, heuristic(start))
+
+    while open_set:
+        current = pop()
+        if current in closed:  # stale entry, a shorter route was found after it was queued
+            continue
+        expanded += 1
+
+        if current == end:
+            return SearchResult(build_path(current, came_from, grid, observer), expanded, pushed)
+
+        closed.add(current)
+        if observer is not None:
+            observer(CLOSED, current)
+
+        current_g = g_scores[current]
+        tentative_g_score = current_g + 1  # it's a 2D grid with step 1, unless it has costs
+        for offset in neighbour_offsets[masks[current]]:
+            neighbor = current + offset
+            if neighbor in closed:
+                continue
+            if costs is not None:
+                tentative_g_score = current_g + costs[neighbor]
+            if tentative_g_score >= g_scores.get(neighbor, tentative_g_score + 1):
+                continue
+
+            came_from[neighbor] = current
+            g_scores[neighbor] = tentative_g_score
+            pushed += 1
+            push(neighbor, tentative_g_score + heuristic(neighbor))
+            if observer is not None:
+                observer(OPEN, neighbor)
+
+    return SearchResult([], expanded, pushed)
+
+
+def dijkstra(grid, start, end, observer=None, open_list=BucketQueue):
+    """Dijkstra's algorithm, a_star without heuristic: its own name in the benchmarks and the path cache"""
+    return a_star(grid, start, end, True, observer, open_list)
@@ -0,0 +1,71 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""
+Batch queries: many (start, end) pairs on the same grid solved by a pool of worker processes.
+The cell states, neighbour masks and costs are put once in shared memory, workers attach to them by name
+so a task only carries its queries, never the grid.
+"""
+import os
+from grid_model import Grid
+from solvers.astar import a_star
+
+_worker = {}  # grid and shared memory blocks of the current worker process
+
+
+def _share(data):
+    from multiprocessing import shared_memory
+    block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    block.buf[:len(data)] = data
+    return block
+
+
+def _attach(rows, columns, states_name, masks_name, costs_name=None):
+    """Worker initializer: open the shared blocks and build a Grid directly on top of them"""
+    from multiprocessing import shared_memory
+    size = rows * columns
+    states = shared_memory.SharedMemory(name=states_name)
+    masks = shared_memory.SharedMemory(name=masks_name)
+    costs = shared_memory.SharedMemory(name=costs_name) if costs_name else None
+    _worker["blocks"] = (states, masks, costs)  # keep them open for the lifetime of the worker
+    _worker["grid"] = Grid(rows, columns, states.buf[:size], masks.buf[:size],
+                           costs.buf[:size] if costs is not None else None)
+
+
+def _solve_chunk(solver, chunk, kwargs):
+    grid = _worker["grid"]
+    return [(number, solver(grid, start, end, **kwargs)) for number, (start, end) in chunk]
+
+
+def solve_many(grid, queries, solver=a_star, max_workers=None, chunk_size=None, **kwargs):
+    """
+    Solve every (start, end) query of queries with solver, yield (query number, SearchResult) pairs as soon as
+    they are done (not in query order). Queries are sent to the workers in chunks of chunk_size,
+    by default enough chunks to give each worker about 8 of them. solver must be a module level function.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed  # imported on use, it is slow to import
+    queries = list(queries)
+    if not queries:
+        return
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(queries) // (max_workers * 8))
+
+    blocks = [_share(grid.states), _share(grid.masks)]
+    if grid.costs is not None:
+        blocks.append(_share(grid.costs))
+    try:
+        with ProcessPoolExecutor(max_workers, initializer=_attach,
+                                 initargs=(grid.rows, grid.columns, *(block.name for block in blocks))) as pool:
+            numbered = list(enumerate(queries))
+            futures = [pool.submit(_solve_chunk, solver, numbered[k:k + chunk_size], kwargs)
+                       for k in range(0, len(numbered), chunk_size)]
+            try:
+                for future in as_completed(futures):
+                    yield from future.result()
+            finally:
+                for future in futures:  # consumer stopped early or a query failed
+                    future.cancel()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
@@ -0,0 +1,43 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from collections import deque
+from grid_model import OPEN, CLOSED
+from solvers.common import SearchResult, build_path, check_endpoints
+
+
+def bfs(grid, start, end, observer=None):
+    """
+    BFS algorithm
+    https://en.wikipedia.org/wiki/Breadth-first_search
+    """
+    start, end = check_endpoints(grid, start, end)
+    masks, neighbour_offsets = grid.masks, grid.neighbour_offsets
+
+    queue = deque((start,))
+    came_from = {start: -1}  # also used as the visited set
+    expanded, pushed = 0, 1
+
+    while queue:
+        current = queue.popleft()
+        expanded += 1
+
+        if current == end:  # only when start is end
+            return SearchResult(build_path(end, {}, grid, observer), expanded, pushed)
+
+        if observer is not None:
+            observer(CLOSED, current)
+
+        for offset in neighbour_offsets[masks[current]]:
+            neighbor = current + offset
+            if neighbor in came_from:
+                continue
+
+            came_from[neighbor] = current
+            if neighbor == end:  # the first time end is reached is through a shortest path
+                del came_from[start]
+                return SearchResult(build_path(end, came_from, grid, observer), expanded, pushed)
+            pushed += 1
+            queue.append(neighbor)
+            if observer is not None:
+                observer(OPEN, neighbor)
+
+    return SearchResult([], expanded, pushed)
@@ -0,0 +1,128 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from heapq import heappush, heappop
+from grid_model import OPEN, CLOSED, PATH
+from solvers.common import SearchResult, check_endpoints
+
+
+def bidirectional_bfs(grid, start, end, observer=None):
+    """
+    Bidirectional BFS: grows one BFS level at a time from start and from end, always the smaller frontier
+    https://en.wikipedia.org/wiki/Bidirectional_search
+
+    Nodes are checked against the other side when they are discovered, so the first meeting is on a
+    shortest path: every node the other side reached before its current frontier was already expanded.
+    """
+    start, end = check_endpoints(grid, start, end)
+    masks, neighbour_offsets, columns = grid.masks, grid.neighbour_offsets, grid.columns
+    if start == end:
+        return SearchResult(_join(start, {}, {}, columns, observer), 1, 1)
+
+    came_from = ({start: -1}, {end: -1})  # per side, also used as the visited sets
+    frontiers = ([start], [end])
+    expanded, pushed = 0, 2
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        mine, other = came_from[side], came_from[1 - side]
+        next_frontier = []
+        for current in frontiers[side]:
+            expanded += 1
+            if observer is not None:
+                observer(CLOSED, current)
+
+            for offset in neighbour_offsets[masks[current]]:
+                neighbor = current + offset
+                if neighbor in mine:
+                    continue
+                mine[neighbor] = current
+                if neighbor in other:
+                    path = _join(neighbor, came_from[0], came_from[1], columns, observer)
+                    return SearchResult(path, expanded, pushed)
+                pushed += 1
+                next_frontier.append(neighbor)
+                if observer is not None:
+                    observer(OPEN, neighbor)
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+    return SearchResult([], expanded, pushed)
+
+
+def bidirectional_a_star(grid, start, end, observer=None):
+    """
+    Bidirectional A*: one A* from start towards end and one from end towards start, Manhattan heuristics
+    https://en.wikipedia.org/wiki/Bidirectional_search
+
+    mu is the shortest start-end path seen where the two searches touch. With admissible heuristics no
+    path through an open node is shorter than either side's lowest f, so the search stops once
+    max(lowest f forward, lowest f backward) >= mu. The side with the smaller open list is expanded.
+    """
+    start, end = check_endpoints(grid, start, end)
+    masks, neighbour_offsets, columns = grid.masks, grid.neighbour_offsets, grid.columns
+    targets = (divmod(end, columns), divmod(start, columns))
+
+    g_scores = ({start: 0}, {end: 0})
+    came_from = ({}, {})
+    closed = (set(), set())
+    counter = 0  # decreasing tie breaker: the last node reached of an f level, the deepest, comes out first
+    heaps = ([(_manhattan(start, targets[0], columns), 0, start, 0)],
+             [(_manhattan(end, targets[1], columns), 0, end, 0)])
+    expanded, pushed = 0, 2
+    mu, meeting = (0, start) if start == end else (float("inf"), -1)
+
+    while True:
+        for side in (0, 1):  # drop stale entries so the tops hold the real lowest f
+            heap, side_closed, side_g = heaps[side], closed[side], g_scores[side]
+            while heap and (heap[0][2] in side_closed or heap[0][3] != side_g[heap[0][2]]):
+                heappop(heap)
+        if not heaps[0] or not heaps[1] or mu <= max(heaps[0][0][0], heaps[1][0][0]):
+            break
+
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        heap, side_g, other_g, target = heaps[side], g_scores[side], g_scores[1 - side], targets[side]
+        _, _, current, current_g = heappop(heap)
+        closed[side].add(current)
+        expanded += 1
+        if observer is not None:
+            observer(CLOSED, current)
+
+        tentative_g_score = current_g + 1  # it's a 2D grid with step 1
+        for offset in neighbour_offsets[masks[current]]:
+            neighbor = current + offset
+            if neighbor in closed[side]:
+                continue
+            if tentative_g_score >= side_g.get(neighbor, tentative_g_score + 1):
+                continue
+
+            came_from[side][neighbor] = current
+            side_g[neighbor] = tentative_g_score
+            counter -= 1
+            pushed += 1
+            heappush(heap, (tentative_g_score + _manhattan(neighbor, target, columns), counter, neighbor,
+                            tentative_g_score))
+            if observer is not None:
+                observer(OPEN, neighbor)
+            if neighbor in other_g and tentative_g_score + other_g[neighbor] < mu:
+                mu, meeting = tentative_g_score + other_g[neighbor], neighbor
+
+    if meeting < 0:
+        return SearchResult([], expanded, pushed)
+    return SearchResult(_join(meeting, came_from[0], came_from[1], columns, observer), expanded, pushed)
+
+
+def _manhattan(index, target, columns):
+    i, j = divmod(index, columns)
+    return abs(i - target[0]) + abs(j - target[1])
+
+
+def _join(meeting, forward, backward, columns, observer=None):
+    """Path from start to end through meeting: forward parents back to start, backward parents on to end"""
+    path = [meeting]
+    while forward.get(path[-1], -1) >= 0:
+        path.append(forward[path[-1]])
+    path.reverse()
+    while backward.get(path[-1], -1) >= 0:
+        path.append(backward[path[-1]])
+    if observer is not None:
+        for index in path:
+            observer(PATH, index)
+    return [divmod(index, columns) for index in path]
@@ -0,0 +1,197 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from array import array
+from collections import OrderedDict
+from solvers.common import SearchResult
+from solvers.astar import a_star, dijkstra
+from solvers.bfs import bfs
+from solvers.dfs import dfs_iterative
+from solvers.jps import jump_point_search
+from solvers.bidirectional import bidirectional_bfs, bidirectional_a_star
+from solvers.trace import trace, trace_in_background
+from solvers.wavefront import wavefront
+
+# solvers always returning a shortest path, their cached paths survive edits that cannot shorten them
+SHORTEST = {a_star, dijkstra, bfs, jump_point_search, bidirectional_bfs, bidirectional_a_star, wavefront}
+# solvers only looking at the neighbours of the cells they report, jump point search scans further
+LOCAL = {a_star, dijkstra, bfs, dfs_iterative, bidirectional_bfs, bidirectional_a_star, wavefront}
+# solvers reading grid.costs, the others count steps and never depend on costs
+WEIGHTED = {a_star, dijkstra}
+
+
+class _Entry:
+    __slots__ = ("start", "end", "shortest", "local", "weighted", "path", "cost", "expanded", "pushed", "trace",
+                 "touched", "nbytes")
+
+
+class PathCache:
+    """
+    LRU cache of solver results on one grid, keyed by (solver, start, end, solver arguments) and kept valid
+    by the grid watchers, the grid is never hashed again: bulk edits (grid.states_changed, costs_changed)
+    drop every entry, and the grid reports every wall drawn or erased, an edit only drops the entries it
+    could change and the others stay valid:
+    - paths (solve): a new wall drops the paths going through it, an erased wall drops the paths of
+      non shortest solvers, the failed queries and the paths longer than the detour through that cell
+    - traces (trace, replayed by the visualizer): any edit on or next to a cell the search reported,
+      any edit at all for the solvers that look further (jump point search)
+    - cost edits only concern the solvers reading costs: a dearer cell drops the paths going through it, a
+      cheaper one the paths costing more than the detour through that cell, traces follow the rule above
+    Entries are evicted least recently used first once their estimated size passes max_bytes.
+    """
+
+    def __init__(self, grid, max_bytes=64 * 1024 * 1024):
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+        self.edits = 0  # wall and cost edits so far, a background search is cached if none came after its start
+        self.pending = []  # (key, solver, start, end, SearchTrace, edits at its start) of the background searches
+        grid.watchers.append(self._on_wall_change)
+        grid.cost_watchers.append(self._on_cost_change)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def solve(self, solver, start, end, **kwargs):
+        """Cached solver(grid, start, end, **kwargs)"""
+        key = ("path", solver, tuple(start), tuple(end), tuple(sorted(kwargs.items())))
+        entry = self._lookup(key)
+        if entry is not None:
+            columns = self.grid.columns
+            return SearchResult([divmod(index, columns) for index in entry.path], entry.expanded, entry.pushed)
+        result = solver(self.grid, start, end, **kwargs)
+        entry = self._new_entry(solver, start, end, result)
+        entry.nbytes = 200 + entry.path.itemsize * len(entry.path)
+        self._store(key, entry)
+        return result
+
+    def trace(self, solver, start, end, background=False, **kwargs):
+        """
+        Cached solvers.trace(solver, grid, start, end, **kwargs), the recorded search can be replayed again.
+        background=True runs a missing search with solvers.trace_in_background and returns at once, the search
+        is cached once over if no wall or cost was edited in the meantime
+        """
+        key = ("trace", solver, tuple(start), tuple(end), tuple(sorted(kwargs.items())))
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry.trace
+        if background:
+            recorded = trace_in_background(solver, self.grid, start, end, **kwargs)
+            self.pending.append((key, solver, start, end, recorded, self.edits))
+        else:
+            recorded = trace(solver, self.grid, start, end, **kwargs)
+            self._store_trace(key, solver, start, end, recorded)
+        return recorded
+
+    def _store_trace(self, key, solver, start, end, recorded):
+        entry = self._new_entry(solver, start, end, recorded.result)
+        entry.trace = recorded
+        entry.touched = set(recorded.indices)  # wall and cost edits test 5 cells against it, not the whole trace
+        entry.nbytes = 200 + 9 * len(recorded) + 64 * len(entry.touched) + 80 * len(recorded.result.path)
+        self._store(key, entry)
+
+    def _collect(self):
+        """Cache the background searches over since the last lookup, if the grid wasn't edited after their start"""
+        running = []
+        for pending in self.pending:
+            key, solver, start, end, recorded, edits = pending
+            if recorded.result is None and recorded.error is None:
+                running.append(pending)
+            elif recorded.error is None and edits == self.edits:
+                self._store_trace(key, solver, start, end, recorded)
+        self.pending = running
+
+    def _lookup(self, key):
+        if self.pending:
+            self._collect()
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def _new_entry(self, solver, start, end, result):
+        entry = _Entry()
+        entry.start, entry.end = self.grid.index(*start), self.grid.index(*end)
+        entry.shortest = solver in SHORTEST
+        entry.local = solver in LOCAL
+        entry.weighted = solver in WEIGHTED
+        entry.path = array("q", (self.grid.index(i, j) for i, j in result.path))
+        costs = self.grid.costs
+        if entry.weighted and costs is not None:  # cost of the path, its number of steps otherwise
+            entry.cost = sum(costs[index] for index in entry.path[1:])
+        else:
+            entry.cost = len(entry.path) - 1
+        entry.expanded, entry.pushed = result.expanded, result.pushed
+        entry.trace = entry.touched = None
+        return entry
+
+    def _store(self, key, entry):
+        if entry.nbytes > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self.entries[key] = entry
+        self.nbytes += entry.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def _on_wall_change(self, index, passable):
+        """Grid watcher: drop the entries the edit of cell index could change"""
+        self.edits += 1
+        if index < 0:  # bulk change
+            self.clear()
+            return
+        columns = self.grid.columns
+        near = {index, index - 1, index + 1, index - columns, index + columns}
+        i, j = divmod(index, columns)
+        for key, entry in list(self.entries.items()):
+            if entry.trace is not None:
+                stale = not entry.local or not near.isdisjoint(entry.touched)
+            elif not entry.shortest:
+                stale = True
+            elif not passable:
+                stale = index in entry.path
+            else:
+                start_i, start_j = divmod(entry.start, columns)
+                end_i, end_j = divmod(entry.end, columns)
+                detour = abs(i - start_i) + abs(j - start_j) + abs(i - end_i) + abs(j - end_j)
+                stale = len(entry.path) == 0 or detour < entry.cost
+            if stale:
+                del self.entries[key]
+                self.nbytes -= entry.nbytes
+
+    def _on_cost_change(self, index, old, new):
+        """Grid cost watcher: drop the entries of the solvers reading costs that the edit could change"""
+        self.edits += 1
+        columns = self.grid.columns
+        near = {index, index - 1, index + 1, index - columns, index + columns}
+        i, j = divmod(index, columns)
+        for key, entry in list(self.entries.items()):
+            if not entry.weighted:
+                continue
+            if index < 0:  # costs replaced or cleared
+                stale = True
+            elif entry.trace is not None:
+                stale = not entry.local or not near.isdisjoint(entry.touched)
+            elif len(entry.path) == 0:  # costs don't make cells reachable
+                stale = False
+            elif index in entry.path[1:]:  # a cheaper cell keeps the path shortest, a dearer one may not
+                stale = new > old
+                entry.cost += new - old
+            else:
+                start_i, start_j = divmod(entry.start, columns)
+                end_i, end_j = divmod(entry.end, columns)
+                detour = abs(i - start_i) + abs(j - start_j) + abs(i - end_i) + abs(j - end_j)
+                stale = new < old and detour < entry.cost
+            if stale:
+                del self.entries[key]
+                self.nbytes -= entry.nbytes
@@ -0,0 +1,57 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from grid_model import PATH
+
+
+class SearchResult:
+    """Path found by a solver (list of (i, j) from start to end, empty if none) and search statistics"""
+
+    __slots__ = ("path", "expanded", "pushed")
+
+    def __init__(self, path, expanded=0, pushed=0):
+        self.path = path
+        self.expanded = expanded  # nodes taken out of the open list
+        self.pushed = pushed  # nodes put in the open list
+
+    @property
+    def found(self):
+        return len(self.path) > 0
+
+    @property
+    def length(self):
+        """Number of steps of the path, -1 if there is no path"""
+        return len(self.path) - 1
+
+    def __repr__(self):
+        return f"SearchResult(length={self.length}, expanded={self.expanded}, pushed={self.pushed})"
+
+
+def build_path(end, came_from, grid, observer=None):
+    """Walk came_from back from end, return the path as (i, j) positions from start to end"""
+    columns = grid.columns
+    path = [end]
+    node = end
+    while node in came_from:
+        node = came_from[node]
+        path.append(node)
+    path.reverse()
+    if observer is not None:
+        for node in path:
+            observer(PATH, node)
+    return [divmod(node, columns) for node in path]
+
+
+def path_cost(grid, path):
+    """Cost of a path of (i, j) positions: the costs of the cells stepped onto, its length without costs"""
+    if not path:
+        return -1
+    if grid.costs is None:
+        return len(path) - 1
+    return sum(grid.get_cost(i, j) for i, j in path[1:])
+
+
+def check_endpoints(grid, start, end):
+    """Flat indices of start and end, raise ValueError if one of them is off the grid"""
+    for name, (i, j) in (("start", start), ("end", end)):
+        if not grid.in_bounds(i, j):
+            raise ValueError(f"{name} {(i, j)} is outside of the {grid.rows}x{grid.columns} grid")
+    return grid.index(*start), grid.index(*end)
@@ -0,0 +1,43 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from grid_model import OPEN, CLOSED
+from solvers.common import SearchResult, build_path, check_endpoints
+
+
+def dfs_iterative(grid, start, end, observer=None):
+    """
+    DFS iterative algorithm
+    https://en.wikipedia.org/wiki/Depth-first_search#:~:text=Depth%2Dfirst%20search%20(DFS),along%20each%20branch%20before%20backtracking
+    """
+    start, end = check_endpoints(grid, start, end)
+    masks, neighbour_offsets = grid.masks, grid.neighbour_offsets
+
+    stack = [start]
+    came_from = {}
+    closed = set()
+    expanded, pushed = 0, 1
+
+    while stack:
+        current = stack.pop()
+        if current in closed:  # pushed more than once
+            continue
+        expanded += 1
+
+        if current == end:
+            return SearchResult(build_path(current, came_from, grid, observer), expanded, pushed)
+
+        closed.add(current)
+        if observer is not None:
+            observer(CLOSED, current)
+
+        for offset in neighbour_offsets[masks[current]]:
+            neighbor = current + offset
+            if neighbor in closed:
+                continue
+
+            stack.append(neighbor)
+            pushed += 1
+            came_from[neighbor] = current
+            if observer is not None:
+                observer(OPEN, neighbor)
+
+    return SearchResult([], expanded, pushed)
@@ -0,0 +1,173 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from heapq import heappush, heappop
+from grid_model import WALL, OPEN, CLOSED, PATH
+from solvers.common import SearchResult, check_endpoints
+
+INF = float("inf")
+
+
+class DStarLite:
+    """
+    D* Lite incremental planner (optimized version of Koenig & Likhachev, 2002)
+    http://idm-lab.org/bib/abstracts/papers/aaai02b.pdf
+
+    Searches backwards from end to start and keeps g/rhs values and its priority queue between plans.
+    The planner watches the grid: when walls are drawn or erased only the cells around them are updated,
+    and the next plan() repairs the affected part of the search instead of starting over.
+    move_start() follows an agent walking along the path without losing the search either.
+    """
+
+    def __init__(self, grid, start, end):
+        self.grid = grid
+        self.start, self.end = check_endpoints(grid, start, end)
+        self.changed = set()  # cells whose wall state changed since the last plan
+        self.reset_needed = False
+        grid.watchers.append(self._on_wall_change)
+        self._initialize()
+
+    def close(self):
+        """Stop watching the grid"""
+        if self._on_wall_change in self.grid.watchers:
+            self.grid.watchers.remove(self._on_wall_change)
+
+    def move_start(self, start):
+        """Agent moved to start (i, j), the next plan() keeps the search and only corrects the keys"""
+        grid = self.grid
+        if not grid.in_bounds(*start):
+            raise ValueError(f"start {tuple(start)} is outside of the {grid.rows}x{grid.columns} grid")
+        start = grid.index(*start)
+        if grid.states[self.start] == WALL or grid.states[start] == WALL:  # the successors around them change
+            self.changed.update((self.start, start))
+        self.start = start
+
+    def plan(self, observer=None):
+        """Repair the search after the recorded changes, return the path from start to end"""
+        if self.reset_needed:
+            self._initialize()
+        elif self.changed:
+            self.km += self._h(self.last, self.start)
+            self.last = self.start
+            columns, size = self.grid.columns, self.grid.size
+            for cell in self.changed:
+                j = cell % columns
+                for u in (cell, cell - columns, cell + columns, cell - 1 if j > 0 else -1,
+                          cell + 1 if j < columns - 1 else -1):
+                    if 0 <= u < size and u != self.end:
+                        self.rhs[u] = self._lowest_rhs(u)
+                        self._update_vertex(u, observer)
+            self.changed.clear()
+        self.expanded = self.pushed = 0
+        self._compute_shortest_path(observer)
+        return SearchResult(self._extract_path(observer), self.expanded, self.pushed)
+
+    def _initialize(self):
+        self.g = {}
+        self.rhs = {self.end: 0}
+        self.km = 0
+        self.last = self.start
+        self.queue = []  # (k1, k2, node) entries, only valid if equal to queued[node]
+        self.queued = {}
+        self.expanded = self.pushed = 0
+        self.changed.clear()
+        self.reset_needed = False
+        self._push(self.end, self._key(self.end))
+
+    def _on_wall_change(self, index, passable):
+        if index < 0:
+            self.reset_needed = True
+        else:
+            self.changed.add(index)
+
+    def _h(self, a, b):
+        columns = self.grid.columns
+        return abs(a // columns - b // columns) + abs(a % columns - b % columns)
+
+    def _key(self, u):
+        m = min(self.g.get(u, INF), self.rhs.get(u, INF))
+        return m + self._h(self.start, u) + self.km, m
+
+    def _push(self, u, key):
+        self.queued[u] = key
+        heappush(self.queue, (key[0], key[1], u))
+        self.pushed += 1
+
+    def _successors(self, u):
+        """
+        Neighbours reachable in one step, none from a wall but the start: a search leaves a start drawn over
+        with a wall as bfs does, so that start is also a neighbour of the cells around it
+        """
+        grid, start = self.grid, self.start
+        if grid.states[u] == WALL and u != start:
+            return []
+        successors = [u + offset for offset in grid.neighbour_offsets[grid.masks[u]]]
+        if grid.states[start] == WALL and self._h(u, start) == 1:
+            successors.append(start)
+        return successors
+
+    def _lowest_rhs(self, u):
+        g = self.g
+        return min((g.get(s, INF) + 1 for s in self._successors(u)), default=INF)
+
+    def _update_vertex(self, u, observer):
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            if observer is not None and u not in self.queued and self.grid.states[u] != WALL:
+                observer(OPEN, u)
+            self._push(u, self._key(u))
+        else:
+            self.queued.pop(u, None)
+
+    def _compute_shortest_path(self, observer):
+        queue, queued, g, rhs, end = self.queue, self.queued, self.g, self.rhs, self.end
+        while True:
+            while queue and queued.get(queue[0][2]) != queue[0][:2]:  # stale entry
+                heappop(queue)
+            start_key = self._key(self.start)
+            if not queue or (queue[0][:2] >= start_key and rhs.get(self.start, INF) == g.get(self.start, INF)):
+                return
+            k_old = queue[0][:2]
+            u = queue[0][2]
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u, k_new)
+                continue
+            heappop(queue)
+            del queued[u]
+            self.expanded += 1
+            if observer is not None and self.grid.states[u] != WALL:  # a new wall is expanded to repair around it
+                observer(CLOSED, u)
+
+            if g.get(u, INF) > rhs.get(u, INF):  # overconsistent: settle u
+                g[u] = rhs[u]
+                for s in self._successors(u):
+                    if s != end and g[u] + 1 < rhs.get(s, INF):
+                        rhs[s] = g[u] + 1
+                        self._update_vertex(s, observer)
+            else:  # underconsistent: u got more expensive, so may everything that went through it
+                g_old = g.get(u, INF)
+                g[u] = INF
+                for s in self._successors(u) + [u]:
+                    if s != end and (s == u or rhs.get(s, INF) == g_old + 1):
+                        rhs[s] = self._lowest_rhs(s)
+                    self._update_vertex(s, observer)
+
+    def _extract_path(self, observer):
+        g, u, columns = self.g, self.start, self.grid.columns
+        if g.get(u, INF) == INF:
+            return []
+        path = [u]
+        while u != self.end and len(path) <= self.grid.size:
+            u = min(self._successors(u), key=lambda s: g.get(s, INF))
+            path.append(u)
+        if observer is not None:
+            for index in path:
+                observer(PATH, index)
+        return [divmod(index, columns) for index in path]
+
+
+def d_star_lite(grid, start, end, observer=None):
+    """One shot D* Lite search, keep a DStarLite planner instead to replan incrementally"""
+    planner = DStarLite(grid, start, end)
+    try:
+        return planner.plan(observer)
+    finally:
+        planner.close()
@@ -0,0 +1,267 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from grid_model import WALL, OPEN, CLOSED, PATH
+from solvers.common import SearchResult, check_endpoints
+from solvers.openlist import BucketQueue
+
+ENTRANCE_SPLIT = 6  # border openings at least this wide get two entrances, one at each end
+
+
+class HierarchicalMap:
+    """
+    HPA* abstraction of a grid (Botea, Müller & Schaeffer, 2004)
+    https://webdocs.cs.ualberta.ca/~mmueller/ps/hpastar.pdf
+
+    The grid is cut into cluster_size x cluster_size clusters. Every opening in the border between two clusters
+    gets one or two entrances, pairs of facing cells linked by a step of 1, and the distances between the
+    entrances of a cluster are precomputed with a BFS restricted to it. A query searches this small graph
+    and only the clusters the abstract path goes through are searched cell by cell, so long queries cost about
+    the path length and not the map area. Paths are near optimal, not always the shortest.
+    The map watches the grid: a wall edit rebuilds the cluster it is in, and the neighbour cluster too when
+    the cell is on their common border, the next time a path is asked for.
+    """
+
+    def __init__(self, grid, cluster_size=16):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-grid.rows // cluster_size)
+        self.cluster_columns = -(-grid.columns // cluster_size)
+        self.borders = {}  # (cluster, "E" or "S") -> [(cell, facing cell in the next cluster), ...]
+        self.links = {}  # entrance cell -> facing entrance cells in the neighbour clusters
+        self.nodes = {}  # cluster -> its entrance cells
+        self.edges = {}  # entrance cell -> {entrance cell of the same cluster: distance}
+        self.dirty_borders = set()
+        self.dirty_clusters = set()
+        self.clusters_built = 0  # cluster rebuilds so far, initial build included
+        grid.watchers.append(self._on_wall_change)
+        self._mark_all()
+
+    def close(self):
+        """Stop watching the grid"""
+        if self._on_wall_change in self.grid.watchers:
+            self.grid.watchers.remove(self._on_wall_change)
+
+    def find_path(self, start, end, observer=None):
+        """
+        Path from start to end (i, j), observer gets the entrances the abstract search opens and expands,
+        then the cells of the refined path
+        """
+        start, end = check_endpoints(self.grid, start, end)
+        self._refresh()
+        start_cluster, end_cluster = self._cluster_of(start), self._cluster_of(end)
+        if start_cluster == end_cluster:  # try to stay inside the cluster first
+            path = self._local_path(start, end, start_cluster)
+            if path:
+                return SearchResult(self._finish(path, observer), 1, 1)
+
+        start_edges = self._distances(start, start_cluster, self.nodes[start_cluster] | {end})
+        end_edges = self._distances(end, end_cluster, self.nodes[end_cluster])
+        abstract, expanded, pushed = self._abstract_search(start, end, start_edges, end_edges, observer)
+        if not abstract:
+            return SearchResult([], expanded, pushed)
+
+        path = [start]
+        for a, b in zip(abstract, abstract[1:]):
+            if b in self.links.get(a, ()):  # step across a border
+                path.append(b)
+            else:
+                path.extend(self._local_path(a, b, self._cluster_of(a))[1:])
+        return SearchResult(self._finish(path, observer), expanded, pushed)
+
+    def _finish(self, path, observer):
+        if observer is not None:
+            for index in path:
+                observer(PATH, index)
+        return [divmod(index, self.grid.columns) for index in path]
+
+    def _abstract_search(self, start, end, start_edges, end_edges, observer):
+        """A* on the entrances graph, start and end are linked to the entrances of their own cluster"""
+        columns, edges, links = self.grid.columns, self.edges, self.links
+        end_i, end_j = divmod(end, columns)
+        g_scores = {start: 0}
+        came_from = {}
+        closed = set()
+        open_set = BucketQueue()  # edge costs are grid distances, the Manhattan heuristic stays consistent
+        open_set.push(start, abs(start // columns - end_i) + abs(start % columns - end_j))
+        expanded, pushed = 0, 1
+
+        while open_set:
+            current = open_set.pop()
+            if current in closed:  # stale entry, a shorter route was found after it was queued
+                continue
+            expanded += 1
+            if current == end:
+                path = [end]
+                while path[-1] in came_from:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                return path, expanded, pushed
+            closed.add(current)
+            if observer is not None:
+                observer(CLOSED, current)
+
+            current_g = g_scores[current]
+            neighbours = list(edges.get(current, {}).items()) + [(cell, 1) for cell in links.get(current, ())]
+            if current == start:
+                neighbours += [(cell, d) for cell, d in start_edges.items() if cell != start]
+            if current in end_edges:
+                neighbours.append((end, end_edges[current]))
+            for neighbor, cost in neighbours:
+                tentative_g_score = current_g + cost
+                if neighbor in closed or tentative_g_score >= g_scores.get(neighbor, tentative_g_score + 1):
+                    continue
+                came_from[neighbor] = current
+                g_scores[neighbor] = tentative_g_score
+                i, j = divmod(neighbor, columns)
+                pushed += 1
+                open_set.push(neighbor, tentative_g_score + abs(i - end_i) + abs(j - end_j))
+                if observer is not None:
+                    observer(OPEN, neighbor)
+        return [], expanded, pushed
+
+    # clusters
+
+    def _cluster_of(self, index):
+        i, j = divmod(index, self.grid.columns)
+        return (i // self.cluster_size) * self.cluster_columns + j // self.cluster_size
+
+    def _bounds(self, cluster):
+        """First row, last row + 1, first column, last column + 1 of a cluster"""
+        size = self.cluster_size
+        ci, cj = divmod(cluster, self.cluster_columns)
+        return (ci * size, min((ci + 1) * size, self.grid.rows),
+                cj * size, min((cj + 1) * size, self.grid.columns))
+
+    def _search(self, source, cluster, target=-1):
+        """BFS from source that never leaves cluster, stops at target, return the (distances, parents) dicts"""
+        masks, neighbour_offsets, columns = self.grid.masks, self.grid.neighbour_offsets, self.grid.columns
+        i0, i1, j0, j1 = self._bounds(cluster)
+        distance = {source: 0}
+        came_from = {}
+        frontier = [source]
+        step = 0
+        while frontier and target not in distance:
+            step += 1
+            next_frontier = []
+            for current in frontier:
+                for offset in neighbour_offsets[masks[current]]:
+                    neighbor = current + offset
+                    if neighbor not in distance and i0 <= neighbor // columns < i1 and j0 <= neighbor % columns < j1:
+                        distance[neighbor] = step
+                        came_from[neighbor] = current
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return distance, came_from
+
+    def _distances(self, source, cluster, targets):
+        """{target: distance} of the targets source reaches inside cluster"""
+        distance, _ = self._search(source, cluster)
+        return {target: distance[target] for target in targets if target in distance}
+
+    def _local_path(self, a, b, cluster):
+        """Shortest path from a to b inside cluster as flat indices, [] if b can't be reached from inside"""
+        distance, came_from = self._search(a, cluster, b)
+        if b not in distance:
+            return []
+        path = [b]
+        while path[-1] != a:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path
+
+    # incremental rebuild
+
+    def _mark_all(self):
+        for cluster in range(self.cluster_rows * self.cluster_columns):
+            self.dirty_borders.update(((cluster, "E"), (cluster, "S")))
+            self.dirty_clusters.add(cluster)
+
+    def _on_wall_change(self, index, passable):
+        """Grid watcher: remember the cluster of the cell, and the border it is on if any"""
+        if index < 0:  # bulk change
+            self._mark_all()
+            return
+        size, cluster_columns = self.cluster_size, self.cluster_columns
+        cluster = self._cluster_of(index)
+        self.dirty_clusters.add(cluster)
+        i, j = divmod(index, self.grid.columns)
+        if i % size == 0 and i > 0:
+            self.dirty_borders.add((cluster - cluster_columns, "S"))
+        if i % size == size - 1:
+            self.dirty_borders.add((cluster, "S"))
+        if j % size == 0 and j > 0:
+            self.dirty_borders.add((cluster - 1, "E"))
+        if j % size == size - 1:
+            self.dirty_borders.add((cluster, "E"))
+
+    def _refresh(self):
+        """Rebuild the borders and clusters touched since the last query"""
+        for border in self.dirty_borders:
+            if self._build_border(*border):  # the entrances moved, both clusters get new distances
+                cluster, side = border
+                self.dirty_clusters.update((cluster, cluster + (1 if side == "E" else self.cluster_columns)))
+        self.dirty_borders.clear()
+        for cluster in self.dirty_clusters:
+            self._build_cluster(cluster)
+        self.dirty_clusters.clear()
+
+    def _build_border(self, cluster, side):
+        """Find the entrances between cluster and its east or south neighbour, return True if they changed"""
+        ci, cj = divmod(cluster, self.cluster_columns)
+        if (side == "E" and cj + 1 >= self.cluster_columns) or (side == "S" and ci + 1 >= self.cluster_rows):
+            return False
+        states, columns = self.grid.states, self.grid.columns
+        i0, i1, j0, j1 = self._bounds(cluster)
+        if side == "E":  # last column of cluster facing the first column of the next one
+            cells, across = range(i0 * columns + j1 - 1, i1 * columns, columns), 1
+        else:  # last row facing the first row of the cluster below
+            cells, across = range((i1 - 1) * columns + j0, (i1 - 1) * columns + j1), columns
+
+        transitions = []
+        opening = []
+        for cell in list(cells) + [-1]:
+            if cell >= 0 and states[cell] != WALL and states[cell + across] != WALL:
+                opening.append(cell)
+                continue
+            if len(opening) >= ENTRANCE_SPLIT:
+                transitions += [(opening[0], opening[0] + across), (opening[-1], opening[-1] + across)]
+            elif opening:
+                middle = opening[len(opening) // 2]
+                transitions.append((middle, middle + across))
+            opening = []
+
+        old = self.borders.get((cluster, side), [])
+        if transitions == old:
+            return False
+        for a, b in old:
+            for cell, other in ((a, b), (b, a)):
+                self.links[cell].discard(other)
+                if not self.links[cell]:
+                    del self.links[cell]
+        for a, b in transitions:
+            self.links.setdefault(a, set()).add(b)
+            self.links.setdefault(b, set()).add(a)
+        self.borders[(cluster, side)] = transitions
+        return True
+
+    def _build_cluster(self, cluster):
+        """Collect the entrances of cluster and their distances to each other"""
+        ci, cj = divmod(cluster, self.cluster_columns)
+        sides = [(cluster, "E", 0), (cluster, "S", 0), (cluster - 1, "E", 1) if cj > 0 else None,
+                 (cluster - self.cluster_columns, "S", 1) if ci > 0 else None]
+        nodes = {transition[own] for border, side, own in filter(None, sides)
+                 for transition in self.borders.get((border, side), ())}
+        for cell in self.nodes.get(cluster, ()):
+            self.edges.pop(cell, None)
+        self.nodes[cluster] = nodes
+        for cell in nodes:
+            self.edges[cell] = self._distances(cell, cluster, nodes - {cell})
+        self.clusters_built += 1
+
+
+def hpa_star(grid, start, end, cluster_size=16, observer=None):
+    """One shot HPA* search, the abstraction costs a pass over the whole grid, keep a HierarchicalMap instead"""
+    hierarchy = HierarchicalMap(grid, cluster_size)
+    try:
+        return hierarchy.find_path(start, end, observer)
+    finally:
+        hierarchy.close()
@@ -0,0 +1,81 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+import time
+from grid_model import OPEN, CLOSED, PATH
+
+
+class SearchStats:
+    """
+    Opt-in instrumentation of a search, attached as its observer so that solvers run without it pay nothing.
+    Counters (the solver's own expanded/pushed come from its SearchResult):
+    - opened: OPEN events, reopened: cells opened again by the same search tree (a bidirectional search grows
+      one from each end), with a shorter route: each leaves a stale open list entry
+    - neighbour_checks: passable neighbours looked at by the expanded cells
+    - path_cells: cells walked back by build_path
+    Timers, in seconds: "search" until the first PATH event, "build_path" after it, and whatever the caller
+    adds with add_time (the visualizer adds "replay" and "draw").
+    Events are passed on to observer, so a SearchTrace can record the same search.
+    """
+
+    def __init__(self, grid, observer=None):
+        self.grid = grid
+        self.observer = observer
+        self.result = None
+        self.opened = self.reopened = self.neighbour_checks = self.path_cells = 0
+        self.timers = {}
+        self._trees = {}  # cell -> bits of the search trees that opened it
+        self._tree = 0  # bit of the tree of the cell being expanded
+        self._tree_count = 0
+        self._path_started = None
+
+    def __call__(self, state, index):
+        if state == CLOSED:
+            self.neighbour_checks += len(self.grid.neighbour_offsets[self.grid.masks[index]])
+            self._tree = self._trees.get(index, 0)
+            if not self._tree:  # expanded before being opened: a search start, the root of a new tree
+                self._tree = self._trees[index] = 1 << self._tree_count
+                self._tree_count += 1
+        elif state == OPEN:
+            self.opened += 1
+            trees = self._trees.get(index, 0)
+            if self._tree and trees & self._tree == self._tree:  # opened by this tree already
+                self.reopened += 1
+            self._trees[index] = trees | self._tree
+        elif state == PATH:
+            if self._path_started is None:
+                self._path_started = time.perf_counter()
+            self.path_cells += 1
+        if self.observer is not None:
+            self.observer(state, index)
+
+    def run(self, solver, start, end, **kwargs):
+        """Run solver(grid, start, end, **kwargs) instrumented, return its SearchResult"""
+        began = time.perf_counter()
+        self.result = solver(self.grid, start, end, observer=self, **kwargs)
+        finished = time.perf_counter()
+        path_started = self._path_started or finished
+        self.add_time("search", path_started - began)
+        self.add_time("build_path", finished - path_started)
+        return self.result
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def as_dict(self):
+        """Counters and timers as a plain dict (JSON friendly)"""
+        result = self.result
+        return {"expanded": result.expanded if result else 0, "pushed": result.pushed if result else 0,
+                "opened": self.opened, "reopened": self.reopened, "neighbour_checks": self.neighbour_checks,
+                "path_cells": self.path_cells, "timers": dict(self.timers)}
+
+    def __str__(self):
+        counters = self.as_dict()
+        timers = counters.pop("timers")
+        return ", ".join([f"{name} {value}" for name, value in counters.items()] +
+                         [f"{name} {seconds * 1000:.2f} ms" for name, seconds in timers.items()])
+
+
+def instrument(solver, grid, start, end, observer=None, **kwargs):
+    """Run solver with a SearchStats observer (events passed on to observer), return the stats (result in .result)"""
+    stats = SearchStats(grid, observer)
+    stats.run(solver, start, end, **kwargs)
+    return stats
@@ -0,0 +1,115 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+from grid_model import OPEN, CLOSED, PATH, NORTH, WEST, SOUTH, EAST
+from solvers.common import SearchResult, check_endpoints
+from solvers.openlist import BucketQueue
+
+
+def jump_point_search(grid, start, end, observer=None, open_list=BucketQueue):
+    """
+    Jump Point Search adapted to 4-connected grids, returns paths as short as A*
+    https://en.wikipedia.org/wiki/Jump_point_search
+
+    Symmetric shortest paths are pruned with a vertical-first canonical ordering: a vertical move may be
+    followed by any move, a horizontal move only by the same horizontal move, unless the cell diagonally
+    behind is a wall (forced neighbour). Horizontal scans stop on forced neighbours, vertical scans stop
+    where a horizontal scan would stop. Only the cells where a scan stops (jump points) enter the open list,
+    open_list is its class (solvers.openlist).
+    """
+    start, end = check_endpoints(grid, start, end)
+    masks, columns = grid.masks, grid.columns
+    end_i, end_j = divmod(end, columns)
+
+    def jump_horizontal(index, dx):
+        """Scan the row from index in direction dx, return the next jump point or -1"""
+        step = EAST if dx > 0 else WEST
+        while masks[index] & step:
+            behind = masks[index]
+            index += dx
+            if index == end or masks[index] & ~behind & (NORTH | SOUTH):  # forced neighbour
+                return index
+        return -1
+
+    def jump_vertical(index, dy):
+        """Scan the column from index in direction dy (+/- columns), return the next jump point or -1"""
+        step = SOUTH if dy > 0 else NORTH
+        while masks[index] & step:
+            index += dy
+            if index == end or jump_horizontal(index, -1) >= 0 or jump_horizontal(index, 1) >= 0:
+                return index
+        return -1
+
+    def successors(index, parent):
+        """Jump points reachable from index, pruned by the direction it was reached from"""
+        if parent < 0:  # start node, every direction
+            return (jump_vertical(index, -columns), jump_vertical(index, columns),
+                    jump_horizontal(index, -1), jump_horizontal(index, 1))
+        if parent // columns == index // columns:  # reached horizontally
+            dx = 1 if index > parent else -1
+            forced = masks[index] & ~masks[index - dx]
+            result = [jump_horizontal(index, dx)]
+            if forced & NORTH:
+                result.append(jump_vertical(index, -columns))
+            if forced & SOUTH:
+                result.append(jump_vertical(index, columns))
+            return result
+        dy = columns if index > parent else -columns  # reached vertically
+        return jump_vertical(index, dy), jump_horizontal(index, -1), jump_horizontal(index, 1)
+
+    g_scores = {start: 0}
+    came_from = {}
+    closed = set()
+    expanded, pushed = 0, 1
+
+    open_set = open_list()
+    open_set.push(start, abs(start // columns - end_i) + abs(start % columns - end_j))
+
+    while open_set:
+        current = open_set.pop()
+        if current in closed:  # stale entry, a shorter route was found after it was queued
+            continue
+        expanded += 1
+
+        if current == end:
+            return SearchResult(_build_path(current, came_from, columns, observer), expanded, pushed)
+
+        closed.add(current)
+        if observer is not None:
+            observer(CLOSED, current)
+
+        current_g = g_scores[current]
+        for jump_point in successors(current, came_from.get(current, -1)):
+            if jump_point < 0 or jump_point in closed:
+                continue
+            i, j = divmod(jump_point, columns)
+            tentative_g_score = current_g + abs(i - current // columns) + abs(j - current % columns)
+            if tentative_g_score >= g_scores.get(jump_point, tentative_g_score + 1):
+                continue
+
+            came_from[jump_point] = current
+            g_scores[jump_point] = tentative_g_score
+            pushed += 1
+            open_set.push(jump_point, tentative_g_score + abs(i - end_i) + abs(j - end_j))
+            if observer is not None:
+                observer(OPEN, jump_point)
+
+    return SearchResult([], expanded, pushed)
+
+
+def _build_path(end, came_from, columns, observer=None):
+    """Walk the jump points back from end and fill in the straight segments between them"""
+    jump_points = [end]
+    while jump_points[-1] in came_from:
+        jump_points.append(came_from[jump_points[-1]])
+    jump_points.reverse()
+
+    path = jump_points[:1]
+    for a, b in zip(jump_points, jump_points[1:]):
+        if a // columns == b // columns:
+            step = 1 if b > a else -1
+        else:
+            step = columns if b > a else -columns
+        path.extend(range(a + step, b + step, step))
+    if observer is not None:
+        for index in path:
+            observer(PATH, index)
+    return [divmod(index, columns) for index in path]
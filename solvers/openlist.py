@@ -0,0 +1,82 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""
+Open lists of the best-first solvers, both lock free (queue.PriorityQueue takes a lock on every put/get).
+They have the same interface: push(item, priority), pop() -> item of lowest priority, len().
+Neither supports decrease-key, a cheaper route to a queued item is pushed again and the solver skips the stale
+entry when it comes out (lazy deletion).
+Equal priorities come out last in first out: in A* the most recently reached node of an f level, the deepest,
+is expanded first, so ties don't make the search fan out.
+"""
+from heapq import heappush, heappop
+
+
+class HeapQueue:
+    """Binary heap (heapq), O(log n) push and pop, any priorities"""
+
+    __slots__ = ("heap", "counter")
+
+    def __init__(self):
+        self.heap = []
+        self.counter = 0  # decreasing tie breaker, last in first out
+
+    def push(self, item, priority):
+        self.counter -= 1
+        heappush(self.heap, (priority, self.counter, item))
+
+    def pop(self):
+        return heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class BucketQueue:
+    """
+    Dial's bucket queue, O(1) push and pop for non negative integer priorities that never go below the
+    last popped one: the f scores of A* with a consistent heuristic, the g scores of Dijkstra
+    https://en.wikipedia.org/wiki/Bucket_queue
+
+    Buckets form a ring covering the priorities from the lowest queued one on, it doubles when a push lands
+    beyond it. A step costs at most the highest cell cost C, so A* f scores stay within C + 1 of the lowest
+    and the ring stays that small however long the search.
+    """
+
+    __slots__ = ("buckets", "cursor", "size")
+
+    def __init__(self):
+        self.buckets = [[] for _ in range(8)]  # stacks of items, priority p in buckets[p % len(buckets)]
+        self.cursor = 0  # no queued item has a lower priority
+        self.size = 0
+
+    def push(self, item, priority):
+        if not self.size:
+            self.cursor = priority
+        elif priority < self.cursor:  # below every queued item, the ring must reach back to it
+            self._grow(self.cursor + len(self.buckets) - priority)
+            self.cursor = priority
+        if priority - self.cursor >= len(self.buckets):
+            self._grow(priority - self.cursor + 1)
+        self.buckets[priority % len(self.buckets)].append(item)
+        self.size += 1
+
+    def pop(self):
+        buckets, cursor = self.buckets, self.cursor
+        ring = len(buckets)
+        while not buckets[cursor % ring]:
+            cursor += 1
+        self.cursor = cursor
+        self.size -= 1
+        return buckets[cursor % ring].pop()
+
+    def _grow(self, span):
+        ring = len(self.buckets)
+        new_ring = ring * 2
+        while new_ring < span:
+            new_ring *= 2
+        buckets = [[] for _ in range(new_ring)]
+        for priority in range(self.cursor, self.cursor + ring):
+            buckets[priority % new_ring] = self.buckets[priority % ring]
+        self.buckets = buckets
+
+    def __len__(self):
+        return self.size
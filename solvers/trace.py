@@ -0,0 +1,75 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+import threading
+from array import array
+from grid_model import Grid
+
+
+class SearchTrace:
+    """
+    Observer recording every (state, index) change of a search in two compact arrays,
+    so that a search can be stepped through afterwards as a generator of events.
+    result is None while the search is still running (trace_in_background)
+    """
+
+    def __init__(self):
+        self.states = array("B")
+        self.indices = array("q")
+        self.result = None
+        self.error = None  # exception raised by a search run in the background
+        self.thread = None
+
+    def __call__(self, state, index):
+        self.states.append(state)
+        self.indices.append(index)  # last: events below len(indices) are complete
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        """Yield the recorded (state, index) events in search order"""
+        return zip(self.states, self.indices)
+
+    def wait(self):
+        """Block until the search is over, raise its exception if it failed"""
+        if self.thread is not None:
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+def trace(solver, grid, start, end, **kwargs):
+    """Run solver headless with a recording observer, return the SearchTrace (its result is in .result)"""
+    recorder = SearchTrace()
+    recorder.result = solver(grid, start, end, observer=recorder, **kwargs)
+    return recorder
+
+
+def trace_in_background(solver, grid, start, end, **kwargs):
+    """
+    Start solver on a snapshot of grid in a thread and return its SearchTrace at once: events are appended
+    as the search makes them and .result is set once it is over, so they can be replayed while it runs.
+    Later edits of grid don't reach the search
+    """
+    snapshot = Grid(grid.rows, grid.columns, bytearray(grid.states), bytearray(grid.masks),
+                    None if grid.costs is None else bytearray(grid.costs))
+    recorder = SearchTrace()
+
+    def run():
+        try:
+            recorder.result = solver(snapshot, start, end, observer=recorder, **kwargs)
+        except BaseException as error:  # raised again by wait(), in the thread that replays the search
+            recorder.error = error
+
+    recorder.thread = threading.Thread(target=run, daemon=True)
+    recorder.thread.start()
+    return recorder
+
+
+def steps(solver, grid, start, end, **kwargs):
+    """
+    Solver events as a generator of (state, index), returns its SearchResult. The search itself runs to the
+    end before the first event, use trace_in_background to replay a search while it runs
+    """
+    recorder = trace(solver, grid, start, end, **kwargs)
+    yield from recorder
+    return recorder.result
@@ -0,0 +1 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
@@ -0,0 +1,46 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""D* Lite against bfs, run with python -m pytest"""
+import random
+
+import solvers
+from grid_model import Grid, WALL, BLANK
+
+
+def test_wall_start():
+    """A start drawn over with a wall is left as bfs leaves it, for the one shot search and the planner"""
+    grid = Grid(5, 5)
+    for j in range(4):
+        grid.set(2, j, WALL)
+    grid.set(0, 0, WALL)
+    expected = solvers.bfs(grid, (0, 0), (4, 0))
+    assert expected.found
+    assert solvers.d_star_lite(grid, (0, 0), (4, 0)).length == expected.length
+    planner = solvers.DStarLite(grid, (4, 4), (4, 0))
+    planner.plan()
+    planner.move_start((0, 0))
+    assert planner.plan().length == expected.length
+    planner.move_start((4, 4))
+    assert planner.plan().length == solvers.bfs(grid, (4, 4), (4, 0)).length
+    planner.close()
+
+
+def test_incremental_matches_fresh():
+    """A planner repaired after wall edits and start moves finds the lengths of a fresh search"""
+    rng = random.Random(4)
+    for _ in range(60):
+        rows, columns = rng.randint(2, 16), rng.randint(2, 16)
+        grid = Grid(rows, columns, bytearray(WALL if rng.random() < 0.3 else BLANK for _ in range(rows * columns)))
+        start, end = (0, 0), (rows - 1, columns - 1)
+        grid.set(*end, BLANK)
+        planner = solvers.DStarLite(grid, start, end)
+        for _ in range(12):
+            if rng.random() < 0.7:
+                index = rng.randrange(grid.size)
+                if index != grid.index(*end):
+                    grid.set_index(index, BLANK if grid.states[index] == WALL else WALL)
+            else:
+                start = (rng.randrange(rows), rng.randrange(columns))
+                planner.move_start(start)
+            assert planner.plan().length == solvers.d_star_lite(grid, start, end).length \
+                == solvers.bfs(grid, start, end).length
+        planner.close()
@@ -0,0 +1,40 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""HPA* against bfs and against a fresh abstraction after wall edits, run with python -m pytest"""
+import random
+
+import solvers
+from grid_model import Grid, WALL, BLANK
+
+
+def check_path(grid, path, start, end):
+    assert path[0] == start and path[-1] == end
+    for (i, j), (k, l) in zip(path, path[1:]):
+        assert abs(i - k) + abs(j - l) == 1
+    assert all(grid.get(*cell) != WALL for cell in path)
+
+
+def test_incremental_matches_fresh():
+    """
+    A kept HierarchicalMap rebuilt by its watcher gives the paths of a new one, near optimal: reachable
+    exactly when bfs says so, never shorter than bfs
+    """
+    rng = random.Random(5)
+    for _ in range(25):
+        rows, columns, cluster_size = rng.randint(8, 40), rng.randint(8, 40), rng.choice((4, 5, 8))
+        grid = Grid(rows, columns, bytearray(WALL if rng.random() < 0.25 else BLANK for _ in range(rows * columns)))
+        hierarchy = solvers.HierarchicalMap(grid, cluster_size)
+        for _ in range(10):
+            for _ in range(rng.randint(1, 8)):
+                index = rng.randrange(grid.size)
+                grid.set_index(index, BLANK if grid.states[index] == WALL else WALL)
+            start, end = (rng.randrange(rows), rng.randrange(columns)), (rng.randrange(rows), rng.randrange(columns))
+            grid.set(*start, BLANK)
+            grid.set(*end, BLANK)
+            result = hierarchy.find_path(start, end)
+            expected = solvers.bfs(grid, start, end)
+            assert result.found == expected.found, (rows, columns, cluster_size, start, end)
+            assert result.path == solvers.hpa_star(grid, start, end, cluster_size).path
+            if result.found:
+                check_path(grid, result.path, start, end)
+                assert result.length >= expected.length
+        hierarchy.close()
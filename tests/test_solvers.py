@@ -0,0 +1,66 @@
+# Code by Adrien TIMBERT @ github.com/aleolux
+"""Every solver against bfs on random grids, run with python -m pytest"""
+import random
+
+import pytest
+
+import solvers
+from grid_model import Grid, WALL, BLANK
+from maze import build_random_terrain
+
+SHORTEST = [solvers.a_star, solvers.dijkstra, solvers.jump_point_search, solvers.bidirectional_a_star,
+            solvers.bidirectional_bfs, solvers.d_star_lite]
+if solvers.wavefront_available():
+    SHORTEST.append(solvers.wavefront)
+
+
+def random_queries(seed, count=150):
+    """(grid, start, end) on small random grids, some starts drawn over with a wall, ends always passable"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        rows, columns = rng.randint(1, 20), rng.randint(1, 20)
+        density = rng.choice((0, 0.1, 0.3, 0.45))
+        grid = Grid(rows, columns, bytearray(WALL if rng.random() < density else BLANK for _ in range(rows * columns)))
+        start = (rng.randrange(rows), rng.randrange(columns))
+        end = (rng.randrange(rows), rng.randrange(columns))
+        grid.states[grid.index(*start)] = WALL if rng.random() < 0.1 else BLANK
+        grid.states[grid.index(*end)] = BLANK
+        yield grid, start, end
+
+
+def check_path(grid, path, start, end):
+    """path goes from start to end by single steps, through passable cells past the start"""
+    assert path[0] == start and path[-1] == end
+    for (i, j), (k, l) in zip(path, path[1:]):
+        assert abs(i - k) + abs(j - l) == 1
+    assert all(grid.get(*cell) != WALL for cell in path[1:])
+
+
+@pytest.mark.parametrize("solver", SHORTEST, ids=lambda solver: solver.__name__)
+def test_shortest_length(solver):
+    for grid, start, end in random_queries(1):
+        expected = solvers.bfs(grid, start, end)
+        result = solver(grid, start, end)
+        assert result.length == expected.length, (grid.rows, grid.columns, start, end)
+        if result.found:
+            check_path(grid, result.path, start, end)
+
+
+def test_dfs_reachability():
+    for grid, start, end in random_queries(2):
+        result = solvers.dfs_iterative(grid, start, end)
+        assert result.found == solvers.bfs(grid, start, end).found
+        if result.found:
+            check_path(grid, result.path, start, end)
+
+
+def test_weighted_cost():
+    """A* and Dijkstra agree on the cheapest path cost over terrain"""
+    rng = random.Random(3)
+    for grid, start, end in random_queries(3, 80):
+        build_random_terrain(grid, scale=2, rng=rng.random)
+        a_star, dijkstra = solvers.a_star(grid, start, end), solvers.dijkstra(grid, start, end)
+        assert a_star.found == dijkstra.found == solvers.bfs(grid, start, end).found
+        if a_star.found:
+            check_path(grid, a_star.path, start, end)
+            assert solvers.path_cost(grid, a_star.path) == solvers.path_cost(grid, dijkstra.path)
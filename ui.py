@@ -1,13 +1,33 @@
 # Code by Adrien TIMBERT @ github.com/aleolux
 import pygame
 
+_fonts = {}  # (name, size) -> pygame.font.Font
+_texts = {}  # (text, font name, size, color) -> rendered surface
+
+
+def get_font(name, size):
+    """Shared font, SysFont searches the system fonts so it's only called once per (name, size)"""
+    font = _fonts.get((name, size))
+    if font is None:
+        font = _fonts[(name, size)] = pygame.font.SysFont(name, size)
+    return font
+
+
+def render_text(text, name, size, color):
+    """Antialiased text surface, rendered once and cached"""
+    key = (text, name, size, tuple(color))
+    surface = _texts.get(key)
+    if surface is None:
+        surface = _texts[key] = get_font(name, size).render(text, True, color)
+    return surface
+
 
 # Image class
 class Image:
-    def __init__(self, x, y, image, scale):
+    def __init__(self, x, y, image, scale=1):
         width = image.get_width()
         height = image.get_height()
-        self.image = pygame.transform.scale(image, (int(width * scale), int(height * scale)))
+        self.image = image if scale == 1 else pygame.transform.scale(image, (int(width * scale), int(height * scale)))
         self.rect = self.image.get_rect()
         self.rect.topleft = (x, y)
 
@@ -19,15 +39,24 @@ class Image:
 # button class
 # Credits: Russs123 @ https://github.com/russs123
 class Button:
-    def __init__(self, x, y, image, scale):
+    def __init__(self, x, y, image, scale=1):
         width = image.get_width()
         height = image.get_height()
-        self.image = pygame.transform.scale(image, (int(width * scale), int(height * scale)))
+        self.image = image if scale == 1 else pygame.transform.scale(image, (int(width * scale), int(height * scale)))
         self.rect = self.image.get_rect()
         self.rect.topleft = (x, y)
         self.clicked = False
 
     def draw(self, surface):
+        """Draw the button and return True if it was clicked"""
+        self.render(surface)
+        return self.update()
+
+    def render(self, surface):
+        surface.blit(self.image, (self.rect.x, self.rect.y))
+
+    def update(self):
+        """Return True on the frame the button gets clicked"""
         action = False
         # get mouse position
         pos = pygame.mouse.get_pos()
@@ -41,9 +70,6 @@ class Button:
         if pygame.mouse.get_pressed()[0] == 0:
             self.clicked = False
 
-        # draw button on screen
-        surface.blit(self.image, (self.rect.x, self.rect.y))
-
         return action
 
 
@@ -75,16 +101,25 @@ class Checkbox:
 
         # variables to test the different states of the checkbox
         self.checked = False
+        self.rendered = None  # checked state on screen, None: not drawn yet
 
-    def _draw_button_text(self):
-        self.font = pygame.font.SysFont(self.ft, self.fs)
-        self.font_surf = self.font.render(self.caption, True, self.fc)
-        w, h = self.font.size(self.caption)
+    def _draw_button_text(self, surface):
+        self.font_surf = render_text(self.caption, self.ft, self.fs, self.fc)
+        w, h = self.font_surf.get_size()
         self.font_pos = (self.x + self.to[0], self.y + 12 / 2 - h / 2 +
                          self.to[1])
-        self.surface.blit(self.font_surf, self.font_pos)
-
-    def render_checkbox(self):
+        surface.blit(self.font_surf, self.font_pos)
+        return pygame.Rect(self.font_pos, (w, h))
+
+    def render_caption(self, surface):
+        """Draw the caption on surface, once: it never changes, the background layer keeps it"""
+        return self._draw_button_text(surface)
+
+    def render_checkbox(self, force=False):
+        """Draw the box if its state changed since the last call, return its rect or None if nothing was drawn"""
+        if self.checked == self.rendered and not force:
+            return None
+        self.rendered = self.checked
         if self.checked:
             pygame.draw.rect(self.surface, self.color, self.checkbox_obj)
             pygame.draw.rect(self.surface, self.oc, self.checkbox_outline, 1)
@@ -93,7 +128,7 @@ class Checkbox:
         elif not self.checked:
             pygame.draw.rect(self.surface, self.color, self.checkbox_obj)
             pygame.draw.rect(self.surface, self.oc, self.checkbox_outline, 1)
-        self._draw_button_text()
+        return self.checkbox_obj
 
     def _update(self, event_object):
         x, y = pygame.mouse.get_pos()